@@ -0,0 +1,49 @@
+"""Application settings - environment variables are read once at import"""
+
+import os
+from dataclasses import MISSING, dataclass, fields
+from typing import List, Optional
+
+# backend/ 目录，默认的本地文件放在这里（不依赖启动时的工作目录）
+_BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@dataclass(frozen=True)
+class Settings:
+    """Immutable snapshot of the environment the service was started with"""
+    google_maps_api_key: Optional[str]
+    anthropic_api_key: Optional[str]
+    # 可选项（有默认值，不计入 missing()）
+    maps_cache_path: str = os.path.join(_BACKEND_DIR, "maps_cache.db")
+    
+    @classmethod
+    def from_env(cls) -> "Settings":
+        """
+        Read settings from environment variables (field name in upper case)
+        
+        Unset optional fields keep their defaults.
+        
+        Returns:
+            Settings instance
+        """
+        values = {}
+        for field in fields(cls):
+            value = os.getenv(field.name.upper()) or None
+            if value is not None or field.default is MISSING:
+                values[field.name] = value
+        return cls(**values)
+    
+    def missing(self) -> List[str]:
+        """
+        Names of the required environment variables that are not set
+        
+        Returns:
+            List of missing variable names
+        """
+        return [
+            field.name.upper() for field in fields(self)
+            if field.default is MISSING and getattr(self, field.name) is None
+        ]
+
+
+settings = Settings.from_env()
@@ -2,7 +2,9 @@
 
 from fastapi import FastAPI, HTTPException, BackgroundTasks
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, StreamingResponse
 from contextlib import asynccontextmanager
+import asyncio
 import uuid
 from typing import Dict, Any
 
@@ -17,6 +19,12 @@ from app.services.llm_orchestrator import LLMOrchestrator
 from app.services.report_generator import ReportGenerator
 from app.database import Database
 
+try:
+    import orjson  # noqa: F401
+    from fastapi.responses import ORJSONResponse
+    DEFAULT_RESPONSE_CLASS = ORJSONResponse  # orjson 原生支持 datetime，编码更快
+except ImportError:
+    DEFAULT_RESPONSE_CLASS = JSONResponse
 
 # 全局变量存储服务实例和对话
 conversations: Dict[str, Conversation] = {}
@@ -55,7 +63,8 @@ app = FastAPI(
     title="Travel Planner Service V2",
     description="LLM 驱动的智能旅行规划服务",
     version="2.0.0",
-    lifespan=lifespan
+    lifespan=lifespan,
+    default_response_class=DEFAULT_RESPONSE_CLASS
 )
 
 # CORS 中间件
@@ -112,7 +121,8 @@ async def start_conversation(request: StartConversationRequest):
             assistant_message=latest_message,
             current_plan=conversation.current_plan,
             suggested_actions=_get_suggested_actions(conversation.stage),
-            requires_confirmation=conversation.stage == PlanningStage.FINAL_CONFIRMATION
+            requires_confirmation=conversation.stage == PlanningStage.FINAL_CONFIRMATION,
+            messages=[msg for msg in conversation.messages if msg.type.value == "text"]
         )
         
         return response
@@ -155,7 +165,8 @@ async def continue_conversation(request: ContinueConversationRequest):
             assistant_message=latest_message,
             current_plan=updated_conversation.current_plan,
             suggested_actions=_get_suggested_actions(updated_conversation.stage),
-            requires_confirmation=updated_conversation.stage == PlanningStage.FINAL_CONFIRMATION
+            requires_confirmation=updated_conversation.stage == PlanningStage.FINAL_CONFIRMATION,
+            messages=[msg for msg in updated_conversation.messages if msg.type.value == "text"]
         )
         
         return response
@@ -202,9 +213,16 @@ async def get_plan(conversation_id: str):
     return plan_data
 
 
-@app.get("/api/v2/conversation/{conversation_id}/report")
-async def get_conversation_report(conversation_id: str):
-    """获取指定对话的详细报告（Markdown格式）"""
+def _build_report_plan_data(conversation_id: str):
+    """
+    Look up a conversation's current plan and convert it to report generator input
+    
+    Args:
+        conversation_id: Conversation ID
+        
+    Returns:
+        (plan, plan_data) tuple
+    """
     if conversation_id not in conversations:
         raise HTTPException(status_code=404, detail="对话不存在")
     
@@ -271,8 +289,17 @@ async def get_conversation_report(conversation_id: str):
         "summary": plan.summary if hasattr(plan, "summary") else {}
     }
     
-    # 生成 Markdown 报告
-    report_markdown = report_generator.generate_markdown(
+    return plan, plan_data
+
+
+@app.get("/api/v2/conversation/{conversation_id}/report")
+async def get_conversation_report(conversation_id: str):
+    """获取指定对话的详细报告（Markdown格式，一次返回完整报告；供下载等非流式客户端使用）"""
+    plan, plan_data = _build_report_plan_data(conversation_id)
+    
+    # 生成 Markdown 报告（在线程中渲染，不阻塞事件循环）
+    report_markdown = await asyncio.to_thread(
+        report_generator.generate_markdown,
         plan_data=plan_data,
         include_details=True
     )
@@ -285,6 +312,19 @@ async def get_conversation_report(conversation_id: str):
     }
 
 
+@app.get("/api/v2/conversation/{conversation_id}/report/stream")
+async def stream_conversation_report(conversation_id: str):
+    """以分块方式返回详细报告（按章节边生成边输出，前端可边接收边渲染）"""
+    plan, plan_data = _build_report_plan_data(conversation_id)
+    
+    # 同步生成器由 StreamingResponse 在线程池中迭代，渲染不阻塞事件循环
+    return StreamingResponse(
+        report_generator.generate_markdown_sections(plan_data=plan_data, include_details=True),
+        media_type="text/markdown; charset=utf-8",
+        headers={"X-Plan-Id": str(plan.id)}
+    )
+
+
 @app.get("/api/v2/conversations")
 async def list_conversations():
     """列出所有对话"""
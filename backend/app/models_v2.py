@@ -122,6 +122,7 @@ class ConversationResponse(BaseModel):
     current_plan: Optional[TravelPlan] = Field(None, description="当前计划")
     suggested_actions: List[str] = Field(default_factory=list, description="建议操作")
     requires_confirmation: bool = Field(default=False, description="是否需要确认")
+    messages: List[Message] = Field(default_factory=list, description="文本消息列表（客户端无需再请求对话详情）")
 
 
 class ToolCall(BaseModel):
@@ -25,9 +25,10 @@ class PlanningContext:
         self.directions_cache: Dict[str, Dict[str, Any]] = {}  # Cache directions
         self.places_cache: Dict[str, List[Dict[str, Any]]] = {}  # Cache place searches
     
-    def add_planning_log_entry(self, entry: Dict[str, Any]):
+    def add_planning_log_entry(self, entry: Dict[str, Any], timestamp: Optional[str] = None):
         """Add entry to planning log (source of truth)"""
-        entry["timestamp"] = datetime.now().isoformat()
+        # ISO 时间串，与 PlanningState 的操作记录保持一致
+        entry["timestamp"] = timestamp or datetime.now().isoformat()
         entry["log_id"] = f"log_{len(self.planning_log) + 1}"
         self.planning_log.append(entry)
     
@@ -202,13 +203,20 @@ class PlanningState:
         if stage:
             self.stage = stage
     
-    def add_geocode_operation(self, address: str, result: Dict[str, Any], status: str = "success"):
+    # timestamp：调用方批量记录时传入同一个 ISO 时间串，避免逐条取时间
+    def add_geocode_operation(
+        self,
+        address: str,
+        result: Dict[str, Any],
+        status: str = "success",
+        timestamp: Optional[str] = None
+    ):
         """Add geocode operation to log"""
         self.geocode_operations.append({
             "address": address,
             "result": result,
             "status": status,
-            "timestamp": datetime.now().isoformat()
+            "timestamp": timestamp or datetime.now().isoformat()
         })
     
     def add_directions_operation(
@@ -216,7 +224,8 @@ class PlanningState:
         origin: str,
         destination: str,
         result: Dict[str, Any],
-        status: str = "success"
+        status: str = "success",
+        timestamp: Optional[str] = None
     ):
         """Add directions operation to log"""
         self.directions_operations.append({
@@ -224,30 +233,37 @@ class PlanningState:
             "destination": destination,
             "result": result,
             "status": status,
-            "timestamp": datetime.now().isoformat()
+            "timestamp": timestamp or datetime.now().isoformat()
         })
     
     def add_place_search_operation(
         self,
         query: str,
         results: List[Dict[str, Any]],
-        status: str = "success"
+        status: str = "success",
+        timestamp: Optional[str] = None
     ):
         """Add place search operation to log"""
         self.place_search_operations.append({
             "query": query,
             "results_count": len(results),
             "status": status,
-            "timestamp": datetime.now().isoformat()
+            "timestamp": timestamp or datetime.now().isoformat()
         })
     
-    def add_error(self, error_type: str, error_message: str, context: Optional[Dict[str, Any]] = None):
+    def add_error(
+        self,
+        error_type: str,
+        error_message: str,
+        context: Optional[Dict[str, Any]] = None,
+        timestamp: Optional[str] = None
+    ):
         """Add error to error log"""
         self.errors.append({
             "type": error_type,
             "message": error_message,
             "context": context or {},
-            "timestamp": datetime.now().isoformat()
+            "timestamp": timestamp or datetime.now().isoformat()
         })
     
     def to_dict(self) -> Dict[str, Any]:
@@ -266,4 +282,3 @@ class PlanningState:
                 "errors": len(self.errors)
             }
         }
-
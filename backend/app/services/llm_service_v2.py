@@ -1,9 +1,9 @@
 """V2 版本的 LLM 服务 - 支持工具调用和对话"""
 
-import os
 import json
 from typing import List, Dict, Any, Optional
 import anthropic
+from app.config import settings
 
 
 class LLMService:
@@ -16,7 +16,7 @@ class LLMService:
         Args:
             api_key: Anthropic API key
         """
-        self.api_key = api_key or os.getenv("ANTHROPIC_API_KEY")
+        self.api_key = api_key or settings.anthropic_api_key
         if not self.api_key:
             raise ValueError(
                 "ANTHROPIC_API_KEY not found. "
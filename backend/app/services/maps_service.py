@@ -1,9 +1,21 @@
 """Google Maps service - encapsulates map operations"""
 
-import os
 from typing import List, Dict, Any, Optional
 import googlemaps
 from datetime import datetime
+from app.config import settings
+
+
+def _bucket_time(dt: datetime, bucket_s: int = 300) -> datetime:
+    """
+    Snap a departure time to a fixed-size time bucket
+
+    Rounds up to the next bucket boundary so the result never falls in the
+    past (Google rejects past departure times for traffic-aware requests).
+    Requests within the same 5-minute window then share identical parameters.
+    """
+    epoch = int(dt.timestamp())
+    return datetime.fromtimestamp(epoch + (-epoch % bucket_s), tz=dt.tzinfo)
 
 
 class MapsService:
@@ -16,7 +28,7 @@ class MapsService:
         Args:
             api_key: Google Maps API key. If not provided, will try to get from environment.
         """
-        self.api_key = api_key or os.getenv("GOOGLE_MAPS_API_KEY")
+        self.api_key = api_key or settings.google_maps_api_key
         if not self.api_key:
             raise ValueError(
                 "GOOGLE_MAPS_API_KEY not found. "
@@ -49,7 +61,7 @@ class MapsService:
                 "place_id": result.get("place_id")
             }
         except Exception as e:
-            raise ValueError(f"Geocoding error for '{address}': {str(e)}")
+            raise ValueError(f"Geocoding error for '{address}': {e}") from e
     
     def get_directions(
         self,
@@ -85,7 +97,7 @@ class MapsService:
             }
             
             if departure_time:
-                params["departure_time"] = departure_time
+                params["departure_time"] = _bucket_time(departure_time)
                 params["traffic_model"] = traffic_model
             
             if alternatives:
@@ -112,7 +124,7 @@ class MapsService:
             return self._parse_route(route)
             
         except Exception as e:
-            raise ValueError(f"Directions error: {str(e)}")
+            raise ValueError(f"Directions error: {e}") from e
     
     def _parse_route(self, route: Dict[str, Any]) -> Dict[str, Any]:
         """Parse a single route from directions API response"""
@@ -202,7 +214,7 @@ class MapsService:
             
             # Add traffic-aware parameters if departure_time is provided
             if departure_time:
-                params["departure_time"] = departure_time
+                params["departure_time"] = _bucket_time(departure_time)
                 params["traffic_model"] = traffic_model
             
             matrix = self.client.distance_matrix(**params)
@@ -291,17 +303,14 @@ class MapsService:
             raise
         except googlemaps.exceptions.ApiError as e:
             # Google Maps API specific error
-            raise ValueError(f"Distance matrix API error: {str(e)}. Origins: {origins[:2]}, Destinations: {destinations[:2]}")
+            raise ValueError(f"Distance matrix API error: {e}. Origins: {origins[:2]}, Destinations: {destinations[:2]}") from e
         except Exception as e:
-            # Generic error
-            import traceback
-            error_trace = traceback.format_exc()
+            # Generic error - chain the original exception to keep its traceback
             raise ValueError(
-                f"Distance matrix error: {str(e)}. "
-                f"Origins ({len(origins)}): {origins[:2]}..., "
-                f"Destinations ({len(destinations)}): {destinations[:2]}... "
-                f"Trace: {error_trace[-500:]}"  # Last 500 chars of trace
-            )
+                f"Distance matrix error: {e}. "
+                f"Origins({len(origins)})={origins[:2]}... "
+                f"Destinations({len(destinations)})={destinations[:2]}..."
+            ) from e
     
     def search_places(
         self,
@@ -415,7 +424,7 @@ class MapsService:
             
             return results
         except Exception as e:
-            raise ValueError(f"Place search error: {str(e)}")
+            raise ValueError(f"Place search error: {e}") from e
     
     def search_business_restaurants(
         self,
@@ -502,5 +511,5 @@ class MapsService:
                 "reviews": result.get("reviews", [])[:5]  # Limit to 5 reviews
             }
         except Exception as e:
-            raise ValueError(f"Place details error: {str(e)}")
+            raise ValueError(f"Place details error: {e}") from e
 
@@ -0,0 +1,143 @@
+"""Persistent cache - SQLite-backed key-value store for Maps API results"""
+
+import asyncio
+import atexit
+import pickle
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Optional, Tuple
+
+from app.config import settings
+
+
+class SQLiteCache:
+    """
+    Key-value cache persisted to SQLite so results survive process restarts
+    
+    Writes are buffered and flushed in batches (and once more at interpreter
+    exit); reads see buffered writes immediately. Values are pickled.
+    
+    get() and item assignment block on disk I/O; async code should use
+    aget() / aset(), which run them in a worker thread.
+    """
+    
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        table: str = "kv",
+        ttl: Optional[float] = None,
+        flush_every: int = 100
+    ):
+        """
+        Initialize the cache (the database file is opened on first use)
+        
+        Args:
+            path: SQLite database file path (default: settings.maps_cache_path)
+            table: Table name, one per kind of cached value
+            ttl: Seconds before an entry is considered stale (None: never)
+            flush_every: Number of buffered writes that triggers a flush
+        """
+        self.path = path or settings.maps_cache_path
+        self.table = table
+        self.ttl = ttl
+        self.flush_every = flush_every
+        self._conn: Optional[sqlite3.Connection] = None
+        self._pending: Dict[str, Tuple[bytes, int]] = {}
+        self._lock = threading.Lock()
+        atexit.register(self.flush)
+    
+    @staticmethod
+    def _key(key: Any) -> str:
+        """Store non-string keys (e.g. tuples) by their repr"""
+        return key if isinstance(key, str) else repr(key)
+    
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                f"CREATE TABLE IF NOT EXISTS {self.table} (k TEXT PRIMARY KEY, v BLOB, ts INTEGER)"
+            )
+            self._conn.commit()
+        return self._conn
+    
+    def get(self, key: Any, default: Any = None) -> Any:
+        """
+        Look up a cached value
+        
+        Args:
+            key: Cache key
+            default: Value returned on a miss or a stale entry
+        
+        Returns:
+            Cached value or default
+        """
+        k = self._key(key)
+        with self._lock:
+            row = self._pending.get(k)
+            if row is None:
+                try:
+                    row = self._connect().execute(
+                        f"SELECT v, ts FROM {self.table} WHERE k = ?", (k,)
+                    ).fetchone()
+                except sqlite3.Error:
+                    row = None
+        if row is None:
+            return default
+        if self.ttl is not None and time.time() - row[1] > self.ttl:
+            return default
+        return pickle.loads(row[0])
+    
+    def __getitem__(self, key: Any) -> Any:
+        missing = object()
+        value = self.get(key, missing)
+        if value is missing:
+            raise KeyError(key)
+        return value
+    
+    def __contains__(self, key: Any) -> bool:
+        try:
+            self[key]
+        except KeyError:
+            return False
+        return True
+    
+    def __setitem__(self, key: Any, value: Any):
+        with self._lock:
+            self._pending[self._key(key)] = (pickle.dumps(value), int(time.time()))
+            should_flush = len(self._pending) >= self.flush_every
+        if should_flush:
+            self.flush()
+    
+    async def aget(self, key: Any, default: Any = None) -> Any:
+        """get() in a worker thread (keeps sqlite reads and unpickling off the event loop)"""
+        return await asyncio.to_thread(self.get, key, default)
+    
+    async def aset(self, key: Any, value: Any):
+        """Item assignment in a worker thread (a batch flush may write to disk)"""
+        await asyncio.to_thread(self.__setitem__, key, value)
+    
+    def flush(self):
+        """Write buffered entries to disk"""
+        with self._lock:
+            if not self._pending:
+                return
+            rows = [(k, v, ts) for k, (v, ts) in self._pending.items()]
+            try:
+                conn = self._connect()
+                conn.executemany(
+                    f"INSERT OR REPLACE INTO {self.table} (k, v, ts) VALUES (?, ?, ?)", rows
+                )
+                conn.commit()
+            except sqlite3.Error:
+                return  # 写盘失败时保留缓冲，下次再试
+            self._pending.clear()
+    
+    def close(self):
+        """Flush and close the database connection"""
+        self.flush()
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
@@ -1,7 +1,101 @@
 """Report generator for business trip plans"""
 
-from typing import Dict, Any, List
+import hashlib
+import io
+import json
+import threading
+from typing import Dict, Any, Iterator, List
 from datetime import datetime
+import numpy as np
+from cachetools import LRUCache
+
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+
+# 交通方式显示名称
+_TRANSPORT_MODE_CN = {
+    "driving": "包车/自驾",
+    "transit": "公共交通",
+    "walking": "步行"
+}
+
+# 固定的报告段落（每次生成内容相同）
+_RISK_GUIDE_BLOCK = (
+    "### 交通风险规避\n"
+    "1. **避开高峰时段**：07:00-09:00，16:30-18:30\n"
+    "2. **早出发**：建议在高峰前或高峰后出发\n"
+    "3. **预留缓冲**：每天至少1小时机动时间\n"
+    "4. **选择最优路线**：优先选择避开拥堵的路线\n"
+    "\n"
+    "---\n"
+)
+
+_DATA_SOURCE_BLOCK = (
+    "## 数据来源\n"
+    "\n"
+    "- **地理编码**：Google Maps Geocoding API\n"
+    "- **路线规划**：Google Maps Directions API\n"
+    "- **距离矩阵**：Google Maps Distance Matrix API\n"
+    "- **地点搜索**：Google Maps Places API\n"
+    "\n"
+    "**生成时间**：基于实时API数据\n"
+    "**坐标系统**：WGS84（Google Maps标准）\n"
+    "\n"
+    "---\n"
+)
+
+_NOTES_BLOCK = (
+    "## 注意事项\n"
+    "\n"
+    "1. **实际交通时间可能因拥堵而延长**：建议预留20-30%额外时间\n"
+    "2. **商务会面可能延长时间**：机动缓冲时段很重要\n"
+    "3. **天气因素**：雨季可能影响交通，建议关注天气预报\n"
+    "4. **司机熟悉路况**：包车司机应能提供实时路线调整建议\n"
+    "5. **收费公路**：部分路线需经过收费公路，准备现金或电子支付\n"
+)
+
+# 每段重复使用的行模板（预先绑定 str.format）
+_ROW = "| {time} | {activity} | {location} | {notes} |\n".format
+_MORNING_ITEM = "**{dep}-{arr} {place}**\n- {marker}：{activity}".format
+_AFTERNOON_ITEM = "{index}. **{title}**（{dep}-{arr}）".format
+
+
+if NUMBA_AVAILABLE:
+    @njit(cache=True)
+    def _reduce_segments(dist, dur, high):
+        """Sum distances, durations and high-risk flags (compiled by numba)"""
+        total_distance = 0
+        total_duration = 0
+        high_count = 0
+        for i in range(dist.shape[0]):
+            total_distance += dist[i]
+            total_duration += dur[i]
+            high_count += high[i]
+        return total_distance, total_duration, high_count
+else:
+    def _reduce_segments(dist, dur, high):
+        """Sum distances, durations and high-risk flags (NumPy fallback)"""
+        return dist.sum(), dur.sum(), high.sum()
+
+
+def _flush(report: List[str]) -> str:
+    """Join and clear the buffered report lines (chunk ends where the next one starts)"""
+    chunk = "\n".join(report) + "\n"
+    report.clear()
+    return chunk
+
+
+# 生成时间占位符：缓存的报告不含时间戳，每次返回时再填入当前时间
+_NOW_PLACEHOLDER = "\x00generated_at\x00"
+
+
+# 报告正文缓存：键为 (计划 JSON 摘要, include_details)，值为按时间占位符切开的片段
+_REPORT_CACHE: LRUCache = LRUCache(maxsize=64)
+_REPORT_CACHE_LOCK = threading.Lock()
 
 
 class ReportGenerator:
@@ -18,6 +112,10 @@ class ReportGenerator:
         """
         Generate business trip markdown report from plan data
         
+        The report body is cached by a hash of the plan JSON, so repeated
+        requests for the same plan (download, preview) skip rendering. The
+        generation timestamp is filled in on every call and is never stale.
+        
         Args:
             plan_data: Complete plan data
             include_details: Whether to include detailed information
@@ -25,6 +123,96 @@ class ReportGenerator:
         Returns:
             Markdown formatted business trip report
         """
+        key = self._report_key(plan_data, include_details)
+        with _REPORT_CACHE_LOCK:
+            parts = _REPORT_CACHE.get(key)
+        if parts is None:
+            # 用原始 plan_data 渲染（JSON 只用于计算摘要，不改变输入类型）
+            text = self._render_markdown(plan_data, include_details, _NOW_PLACEHOLDER)
+            parts = tuple(text.split(_NOW_PLACEHOLDER))
+            with _REPORT_CACHE_LOCK:
+                _REPORT_CACHE[key] = parts
+        now_str = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        return now_str.join(parts)
+    
+    def generate_markdown_sections(
+        self,
+        plan_data: Dict[str, Any],
+        include_details: bool = True
+    ) -> Iterator[str]:
+        """
+        Generate the markdown report section by section
+        
+        Each chunk is yielded as soon as it is rendered, so a streaming
+        response can send the title and summary before the daily plans are
+        built. The chunks join to the same text as generate_markdown; a
+        cached report is yielded as one chunk, and a fully rendered one is
+        added to the cache.
+        
+        Args:
+            plan_data: Complete plan data
+            include_details: Whether to include detailed information
+            
+        Yields:
+            Consecutive chunks of the markdown report
+        """
+        key = self._report_key(plan_data, include_details)
+        now_str = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        with _REPORT_CACHE_LOCK:
+            parts = _REPORT_CACHE.get(key)
+        if parts is not None:
+            yield now_str.join(parts)
+            return
+        
+        chunks = []
+        for chunk in self._iter_markdown(plan_data, include_details, _NOW_PLACEHOLDER):
+            chunks.append(chunk)
+            yield chunk.replace(_NOW_PLACEHOLDER, now_str)
+        with _REPORT_CACHE_LOCK:
+            _REPORT_CACHE[key] = tuple("".join(chunks).split(_NOW_PLACEHOLDER))
+    
+    @staticmethod
+    def _report_key(plan_data: Dict[str, Any], include_details: bool) -> tuple:
+        """Cache key: digest of the canonical plan JSON plus the detail flag"""
+        plan_json = json.dumps(plan_data, sort_keys=True, ensure_ascii=False, default=str)
+        return (hashlib.blake2b(plan_json.encode(), digest_size=16).digest(), include_details)
+    
+    def _render_markdown(
+        self,
+        plan_data: Dict[str, Any],
+        include_details: bool,
+        now_str: str
+    ) -> str:
+        """
+        Render the markdown report (pure function of its arguments)
+        
+        Args:
+            plan_data: Complete plan data
+            include_details: Whether to include detailed information
+            now_str: Timestamp written into the header and footer
+            
+        Returns:
+            Markdown formatted business trip report
+        """
+        return "".join(self._iter_markdown(plan_data, include_details, now_str))
+    
+    def _iter_markdown(
+        self,
+        plan_data: Dict[str, Any],
+        include_details: bool,
+        now_str: str
+    ) -> Iterator[str]:
+        """
+        Render the markdown report lazily, one chunk per top-level section
+        
+        Args:
+            plan_data: Complete plan data
+            include_details: Whether to include detailed information
+            now_str: Timestamp written into the header and footer
+            
+        Yields:
+            Report chunks; concatenated they form the full report
+        """
         request = plan_data.get("request", {})
         days = plan_data.get("days", [])
         summary = plan_data.get("summary", {})
@@ -34,51 +222,51 @@ class ReportGenerator:
         # Title - 商务接待行程规划
         city = request.get('city', '商务接待')
         total_days = request.get('total_days', 1)
-        report.append(f"# {city}{total_days}天商务接待行程规划")
-        report.append("")
-        report.append(f"**生成时间**: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
-        report.append("")
+        report.append(
+            f"# {city}{total_days}天商务接待行程规划\n"
+            f"\n"
+            f"**生成时间**: {now_str}\n"
+        )
         
         # Executive Summary - 执行摘要
-        report.append("## 执行摘要")
-        report.append("")
-        report.append("本行程规划基于Google Maps API获取的实际地理数据和路线信息，为商务拜访、客户接待等商务活动提供优化路线建议。")
-        report.append("")
-        report.append("**关键数据：**")
+        report.append(
+            "## 执行摘要\n"
+            "\n"
+            "本行程规划基于Google Maps API获取的实际地理数据和路线信息，为商务拜访、客户接待等商务活动提供优化路线建议。\n"
+            "\n"
+            "**关键数据：**"
+        )
         if summary:
-            report.append(f"- **总行程天数**: {total_days}天")
-            report.append(f"- **团队规模**: {request.get('team_size', 1)}人")
+            report.append(
+                f"- **总行程天数**: {total_days}天\n"
+                f"- **团队规模**: {request.get('team_size', 1)}人"
+            )
             transportation_mode = request.get('transportation_mode', 'driving')
-            transportation_name = {
-                'driving': '包车/自驾',
-                'transit': '公共交通',
-                'walking': '步行'
-            }.get(transportation_mode, transportation_mode)
+            transportation_name = _TRANSPORT_MODE_CN.get(transportation_mode, transportation_mode)
             report.append(f"- **交通方式**: {transportation_name}")
-            if summary.get("total_distance_km"):
-                report.append(f"- **总距离**: {summary['total_distance_km']:.1f}公里")
-            if summary.get("total_duration_hours"):
-                report.append(f"- **总行程时间**: {summary['total_duration_hours']:.1f}小时（不含活动时间）")
+            total_km = summary.get("total_distance_km")
+            if total_km:
+                report.append(f"- **总距离**: {format(total_km, '.1f')}公里")
+            total_hours = summary.get("total_duration_hours")
+            if total_hours:
+                report.append(f"- **总行程时间**: {format(total_hours, '.1f')}小时（不含活动时间）")
             if days:
                 # 提取关键路线数据
-                key_distances = []
-                for day in days:
-                    segments = day.get("segments", [])
-                    for seg in segments:
-                        if seg.get("distance_text"):
-                            key_distances.append(seg["distance_text"])
-                if key_distances:
-                    report.append(f"- **关键路线**: 最长单程约 {max([float(d.replace('km', '').replace('公里', '').strip()) for d in key_distances if 'km' in d or '公里' in d], default=0):.1f} 公里")
+                best = self._longest_segment_km(days)
+                if best > 0:
+                    report.append(f"- **关键路线**: 最长单程约 {best:.1f} 公里")
             report.append("")
         
-        report.append("---")
-        report.append("")
+        report.append("---\n")
         
         # Daily Plans - 参考 jakarta_business_trip/itinerary.md 的详细格式
-        for day_plan in days:
+        day_buckets = []
+        alt_summary = []
+        for index, day_plan in enumerate(days, 1):
             day_num = day_plan.get("day", 1)
-            report.append(f"## 第{day_num}天：{day_plan.get('theme', day_plan.get('region', '商务行程'))}")
-            report.append("")
+            segments = day_plan.get("segments", [])
+            yield _flush(report)
+            report.append(f"## 第{day_num}天：{day_plan.get('theme', day_plan.get('region', '商务行程'))}\n")
             
             # 住宿/起终点
             start_location = day_plan.get("start_location") or day_plan.get("accommodation")
@@ -96,24 +284,28 @@ class ReportGenerator:
                 report.append(f"**日期**: {day_plan['date']}")
                 report.append("")
             
+            buckets = self._bucket_segments(segments)
+            day_buckets.append(buckets)
+            
             # 上午行程
-            morning_segments = [s for s in day_plan.get("segments", []) if s.get("time_period") == "morning" or (s.get("departure_time") and "08" <= s.get("departure_time", "")[:2] <= "12")]
+            morning_segments = buckets["morning"]
             if morning_segments:
-                report.append("### 上午行程（08:00-12:00）")
-                report.append("")
+                report.append("### 上午行程（08:00-12:00）\n")
                 
-                for i, segment in enumerate(morning_segments, 1):
-                    from_loc = segment.get("from_location", "")
-                    to_loc = segment.get("to_location", "")
-                    departure = segment.get("departure_time", "")
-                    arrival = segment.get("arrival_time", "")
+                for i, norm in enumerate(morning_segments, 1):
+                    segment = norm["seg"]
+                    from_loc = norm["from"]
                     
                     # 必去点标识
-                    is_required = segment.get("is_required", False)
-                    required_marker = "**必去**" if is_required else "**可选**"
+                    required_marker = "**必去**" if norm["is_required"] else "**可选**"
                     
-                    report.append(f"**{departure or '08:00'}-{arrival or '12:00'} {to_loc or from_loc}**")
-                    report.append(f"- {required_marker}：{segment.get('activity_description', segment.get('description', ''))}")
+                    report.append(_MORNING_ITEM(
+                        dep=norm["dep"] or "08:00",
+                        arr=norm["arr"] or "12:00",
+                        place=norm["to"] or from_loc,
+                        marker=required_marker,
+                        activity=norm["act"] or segment.get("description", "")
+                    ))
                     
                     if segment.get("coordinates"):
                         coord = segment['coordinates']
@@ -122,17 +314,18 @@ class ReportGenerator:
                     if segment.get("address"):
                         report.append(f"- **地址**：{segment['address']}")
                     
-                    if segment.get("distance_text"):
+                    if norm["dist_text"]:
                         distance_km = segment.get("distance_meters", 0) / 1000 if segment.get("distance_meters") else None
-                        distance_str = segment['distance_text']
                         if distance_km:
-                            report.append(f"- **距离{from_loc or '起点'}**：{distance_km:.1f}km，{segment.get('duration_text', '约' + str(segment.get('duration_seconds', 0) // 60) + '分钟')}")
+                            dk = format(distance_km, ".1f")
+                            dur = norm["dur_text"] or f"约{segment.get('duration_seconds', 0) // 60}分钟"
+                            report.append(f"- **距离{from_loc or '起点'}**：{dk}km，{dur}")
                         else:
-                            report.append(f"- **距离**：{distance_str}")
+                            report.append(f"- **距离**：{norm['dist_text']}")
                     
-                    if segment.get("duration_text"):
-                        duration_text = segment['duration_text']
-                        if segment.get("is_rush_hour"):
+                    duration_text = norm["dur_text"]
+                    if duration_text:
+                        if norm["is_rush_hour"]:
                             non_rush_duration = segment.get("non_rush_duration_text")
                             if non_rush_duration:
                                 report.append(f"- **预计时间**：{non_rush_duration}（非高峰），**高峰时可能{duration_text}**")
@@ -147,41 +340,39 @@ class ReportGenerator:
                     report.append("")
             
             # 中午行程
-            lunch_segments = [s for s in day_plan.get("segments", []) if s.get("time_period") == "lunch" or "午餐" in str(s.get("activity_description", ""))]
+            lunch_segments = buckets["lunch"]
             if lunch_segments:
-                report.append("### 中午行程（12:00-13:30）")
-                report.append("")
+                report.append("### 中午行程（12:00-13:30）\n")
                 
-                for segment in lunch_segments:
-                    to_loc = segment.get("to_location", "")
+                for norm in lunch_segments:
                     report.append(f"**12:00-13:30 商务午餐**")
-                    if to_loc:
-                        report.append(f"- **推荐区域**：{to_loc}")
-                    if segment.get("distance_text"):
-                        report.append(f"- **距离上午地点**：{segment['distance_text']}")
+                    if norm["to"]:
+                        report.append(f"- **推荐区域**：{norm['to']}")
+                    if norm["dist_text"]:
+                        report.append(f"- **距离上午地点**：{norm['dist_text']}")
                     report.append("")
             
             # 下午行程
-            afternoon_segments = [s for s in day_plan.get("segments", []) if s.get("time_period") == "afternoon" or (s.get("departure_time") and "13" <= s.get("departure_time", "")[:2] <= "18")]
+            afternoon_segments = buckets["afternoon"]
             if afternoon_segments:
-                report.append("### 下午行程（13:30-18:00）")
-                report.append("")
-                report.append("**推荐路线顺序：**")
-                report.append("")
+                report.append("### 下午行程（13:30-18:00）\n\n**推荐路线顺序：**\n")
                 
-                for i, segment in enumerate(afternoon_segments, 1):
-                    from_loc = segment.get("from_location", "")
-                    to_loc = segment.get("to_location", "")
-                    departure = segment.get("departure_time", "")
-                    arrival = segment.get("arrival_time", "")
+                for i, norm in enumerate(afternoon_segments, 1):
+                    segment = norm["seg"]
+                    from_loc = norm["from"]
                     
-                    report.append(f"{i}. **{to_loc or segment.get('activity_description', '地点' + str(i))}**（{departure or '13:30'}-{arrival or '18:00'}）")
+                    report.append(_AFTERNOON_ITEM(
+                        index=i,
+                        title=norm["to"] or norm["act"] or f"地点{i}",
+                        dep=norm["dep"] or "13:30",
+                        arr=norm["arr"] or "18:00"
+                    ))
                     
                     if from_loc:
-                        report.append(f"   - 距离{from_loc}：{segment.get('distance_text', '')}，{segment.get('duration_text', '')}")
+                        report.append(f"   - 距离{from_loc}：{norm['dist_text']}，{norm['dur_text']}")
                     
-                    if segment.get("activity_description"):
-                        report.append(f"   - **活动**：{segment['activity_description']}")
+                    if norm["act"]:
+                        report.append(f"   - **活动**：{norm['act']}")
                     
                     if segment.get("advantages"):
                         report.append(f"   - **优势**：{segment['advantages']}")
@@ -194,16 +385,16 @@ class ReportGenerator:
                 # 机动缓冲时段
                 buffer_segment = day_plan.get("buffer_segment")
                 if buffer_segment:
-                    report.append("**机动缓冲时段**")
-                    report.append(f"- **建议地点**：{buffer_segment.get('location', '')}")
-                    report.append(f"- **用途**：应对堵车/加会/临时改点")
-                    report.append("")
+                    report.append(
+                        f"**机动缓冲时段**\n"
+                        f"- **建议地点**：{buffer_segment.get('location', '')}\n"
+                        f"- **用途**：应对堵车/加会/临时改点\n"
+                    )
             
             # 返回酒店或下一站
             return_segment = day_plan.get("return_segment")
             if return_segment:
-                report.append("### 返回酒店")
-                report.append("")
+                report.append("### 返回酒店\n")
                 report.append(f"**{return_segment.get('departure_time', '18:00')}-{return_segment.get('arrival_time', '18:30')} 返回{return_segment.get('to_location', '酒店')}**")
                 if return_segment.get("distance_text"):
                     report.append(f"- 从任何下午点返回：{return_segment['distance_text']}")
@@ -213,44 +404,43 @@ class ReportGenerator:
             # 交通风险评估 - 详细格式
             risks = day_plan.get("risks", [])
             if risks:
-                report.append(f"### 第{day_num}天交通风险评估")
-                report.append("")
+                rsk = io.StringIO()
+                rsk.write(f"### 第{day_num}天交通风险评估\n")
                 
                 high_risks = [r for r in risks if r.get("level") == "high"]
                 medium_risks = [r for r in risks if r.get("level") == "medium"]
                 low_risks = [r for r in risks if r.get("level") == "low"]
                 
                 if high_risks:
-                    report.append("**高风险时段：**")
+                    rsk.write("\n**高风险时段：**\n")
                     for risk in high_risks:
-                        report.append(f"- **{risk.get('time', risk.get('type', '时段'))}**：{risk.get('description', '')}")
+                        rsk.write(f"- **{risk.get('time', risk.get('type', '时段'))}**：{risk.get('description', '')}\n")
                         if risk.get("cause"):
-                            report.append(f"  - **原因**：{risk['cause']}")
+                            rsk.write(f"  - **原因**：{risk['cause']}\n")
                         if risk.get("mitigation"):
-                            report.append(f"  - **缓解措施**：{risk['mitigation']}")
-                    report.append("")
+                            rsk.write(f"  - **缓解措施**：{risk['mitigation']}\n")
                 
                 if medium_risks:
-                    report.append("**中风险路段/时段：**")
+                    rsk.write("\n**中风险路段/时段：**\n")
                     for risk in medium_risks:
-                        report.append(f"- **{risk.get('location', risk.get('type', '路段'))}**：{risk.get('description', '')}")
+                        rsk.write(f"- **{risk.get('location', risk.get('type', '路段'))}**：{risk.get('description', '')}\n")
                         if risk.get("cause"):
-                            report.append(f"  - **原因**：{risk['cause']}")
+                            rsk.write(f"  - **原因**：{risk['cause']}\n")
                         if risk.get("mitigation"):
-                            report.append(f"  - **缓解措施**：{risk['mitigation']}")
-                    report.append("")
+                            rsk.write(f"  - **缓解措施**：{risk['mitigation']}\n")
                 
                 if low_risks:
-                    report.append("**低风险路段/时段：**")
+                    rsk.write("\n**低风险路段/时段：**\n")
                     for risk in low_risks:
-                        report.append(f"- **{risk.get('location', risk.get('type', '路段'))}**：{risk.get('description', '')}")
-                    report.append("")
+                        rsk.write(f"- **{risk.get('location', risk.get('type', '路段'))}**：{risk.get('description', '')}\n")
+                
+                report.append(rsk.getvalue())
             
             # 替代方案 - 详细格式
             alternative_plan = day_plan.get("alternative_plan")
             if alternative_plan:
-                report.append(f"### 第{day_num}天替代方案（时间紧张时）")
-                report.append("")
+                alt_summary.append((day_plan.get("day", index), alternative_plan))
+                report.append(f"### 第{day_num}天替代方案（时间紧张时）\n")
                 
                 if isinstance(alternative_plan, dict):
                     if alternative_plan.get("description"):
@@ -270,31 +460,31 @@ class ReportGenerator:
                     report.append(str(alternative_plan))
                     report.append("")
             
-            report.append("---")
-            report.append("")
+            report.append("---\n")
         
         # 整体交通风险评估总结 - 参考 jakarta_business_trip/itinerary.md
-        all_risks = []
-        for day in days:
-            day_risks = day.get("risks", [])
-            for risk in day_risks:
-                risk['day'] = day.get("day", 0)
-            all_risks.extend(day_risks)
-        
-        if all_risks:
-            report.append("## 整体交通风险评估总结")
-            report.append("")
+        # 单次遍历按等级分组，(day_num, risk) 元组避免修改调用方的数据
+        if any(day.get("risks") for day in days):
+            high_risks, medium_risks = [], []
+            for day in days:
+                day_num = day.get("day", 0)
+                for risk in day.get("risks", []):
+                    level = risk.get("level")
+                    if level == "high":
+                        high_risks.append((day_num, risk))
+                    elif level == "medium":
+                        medium_risks.append((day_num, risk))
             
-            high_risks = [r for r in all_risks if r.get("level") == "high"]
-            medium_risks = [r for r in all_risks if r.get("level") == "medium"]
+            yield _flush(report)
+            report.append("## 整体交通风险评估总结\n")
             
             if high_risks:
-                report.append("### 最高风险路段/时段")
-                report.append("")
-                for i, risk in enumerate(high_risks, 1):
-                    day_num = risk.get('day', 0)
-                    report.append(f"{i}. **第{day_num}天{risk.get('time', risk.get('type', '高风险'))}**")
-                    report.append(f"   - **风险等级**：高")
+                report.append("### 最高风险路段/时段\n")
+                for i, (day_num, risk) in enumerate(high_risks, 1):
+                    report.append(
+                        f"{i}. **第{day_num}天{risk.get('time', risk.get('type', '高风险'))}**\n"
+                        f"   - **风险等级**：高"
+                    )
                     if risk.get("cause"):
                         report.append(f"   - **原因**：{risk['cause']}")
                     if risk.get("mitigation"):
@@ -302,12 +492,12 @@ class ReportGenerator:
                     report.append("")
             
             if medium_risks:
-                report.append("### 中风险路段/时段")
-                report.append("")
-                for i, risk in enumerate(medium_risks, 1):
-                    day_num = risk.get('day', 0)
-                    report.append(f"{i}. **第{day_num}天{risk.get('location', risk.get('type', '中风险'))}**")
-                    report.append(f"   - **风险等级**：中")
+                report.append("### 中风险路段/时段\n")
+                for i, (day_num, risk) in enumerate(medium_risks, 1):
+                    report.append(
+                        f"{i}. **第{day_num}天{risk.get('location', risk.get('type', '中风险'))}**\n"
+                        f"   - **风险等级**：中"
+                    )
                     if risk.get("cause"):
                         report.append(f"   - **原因**：{risk['cause']}")
                     if risk.get("mitigation"):
@@ -315,89 +505,91 @@ class ReportGenerator:
                     report.append("")
             
             if not high_risks and not medium_risks:
-                report.append("✅ 整体交通风险较低，路线规划合理。")
-                report.append("")
+                report.append("✅ 整体交通风险较低，路线规划合理。\n")
         
         # 替代方案总结
-        alternative_plans = [d.get("alternative_plan") for d in days if d.get("alternative_plan")]
-        if alternative_plans:
-            report.append("## 替代方案")
-            report.append("")
-            for i, day in enumerate(days, 1):
-                alt = day.get("alternative_plan")
-                if alt:
-                    report.append(f"### 第{i}天替代方案")
-                    report.append("")
-                    if isinstance(alt, dict):
-                        if alt.get("description"):
-                            report.append(alt["description"])
-                    else:
-                        report.append(str(alt))
-                    report.append("")
-            report.append("---")
-            report.append("")
+        if alt_summary:
+            yield _flush(report)
+            report.append("## 替代方案\n")
+            for alt_day, alt in alt_summary:
+                report.append(f"### 第{alt_day}天替代方案\n")
+                if isinstance(alt, dict):
+                    if alt.get("description"):
+                        report.append(alt["description"])
+                else:
+                    report.append(str(alt))
+                report.append("")
+            report.append("---\n")
         
         # 每日时间表建议 - 参考 jakarta_business_trip/itinerary.md
-        report.append("## 每日时间表建议")
-        report.append("")
+        yield _flush(report)
+        report.append("## 每日时间表建议\n")
         
-        for day_plan in days:
+        for day_plan, buckets in zip(days, day_buckets):
             day_num = day_plan.get("day", 1)
-            report.append(f"### 第{day_num}天时间表")
-            report.append("")
-            report.append("| 时间 | 活动 | 地点 | 备注 |")
-            report.append("|------|------|------|------|")
+            tbl = io.StringIO()
+            tbl.write(
+                f"### 第{day_num}天时间表\n"
+                f"\n"
+                f"| 时间 | 活动 | 地点 | 备注 |\n"
+                f"|------|------|------|------|\n"
+            )
             
             # 上午
-            morning_segments = [s for s in day_plan.get("segments", []) if s.get("time_period") == "morning" or (s.get("departure_time") and "08" <= s.get("departure_time", "")[:2] <= "12")]
-            for seg in morning_segments:
-                time_range = f"{seg.get('departure_time', '08:00')}-{seg.get('arrival_time', '12:00')}"
-                activity = seg.get("activity_description", seg.get("to_location", "商务活动"))
-                location = seg.get("to_location", "")
+            for norm in buckets["morning"]:
+                time_range = f"{norm['dep'] or '08:00'}-{norm['arr'] or '12:00'}"
+                activity = norm["act"] or norm["to"] or "商务活动"
                 notes = ""
-                if seg.get("is_rush_hour"):
+                if norm["is_rush_hour"]:
                     notes += "避开早高峰 "
-                if seg.get("is_required"):
+                if norm["is_required"]:
                     notes += "必去"
-                report.append(f"| {time_range} | {activity} | {location} | {notes} |")
+                tbl.write(_ROW(time=time_range, activity=activity, location=norm["to"], notes=notes))
             
             # 中午
-            lunch_segments = [s for s in day_plan.get("segments", []) if s.get("time_period") == "lunch" or "午餐" in str(s.get("activity_description", ""))]
-            for seg in lunch_segments:
-                report.append(f"| 12:00-13:30 | 商务午餐 | {seg.get('to_location', '')} | {seg.get('distance_text', '')} |")
+            for norm in buckets["lunch"]:
+                tbl.write(_ROW(time="12:00-13:30", activity="商务午餐", location=norm["to"], notes=norm["dist_text"]))
             
             # 下午
-            afternoon_segments = [s for s in day_plan.get("segments", []) if s.get("time_period") == "afternoon" or (s.get("departure_time") and "13" <= s.get("departure_time", "")[:2] <= "18")]
-            for seg in afternoon_segments:
-                time_range = f"{seg.get('departure_time', '13:30')}-{seg.get('arrival_time', '18:00')}"
-                activity = seg.get("activity_description", seg.get("to_location", "商务活动"))
-                location = seg.get("to_location", "")
+            for norm in buckets["afternoon"]:
+                time_range = f"{norm['dep'] or '13:30'}-{norm['arr'] or '18:00'}"
+                activity = norm["act"] or norm["to"] or "商务活动"
                 notes = ""
-                if seg.get("departure_time") and "16:30" <= seg.get("departure_time", "") <= "18:00":
+                if norm["late_departure"]:
                     notes += "避开晚高峰 "
-                report.append(f"| {time_range} | {activity} | {location} | {notes} |")
+                tbl.write(_ROW(time=time_range, activity=activity, location=norm["to"], notes=notes))
             
             # 返回
             return_seg = day_plan.get("return_segment")
             if return_seg:
-                report.append(f"| {return_seg.get('departure_time', '18:00')}-{return_seg.get('arrival_time', '18:30')} | 返回酒店 | {return_seg.get('to_location', '')} | 避开晚高峰尾段 |")
+                tbl.write(_ROW(
+                    time=f"{return_seg.get('departure_time', '18:00')}-{return_seg.get('arrival_time', '18:30')}",
+                    activity="返回酒店",
+                    location=return_seg.get("to_location", ""),
+                    notes="避开晚高峰尾段"
+                ))
             
-            report.append("")
+            report.append(tbl.getvalue())
         
         # 关键建议总结 - 参考 jakarta_business_trip/itinerary.md
-        report.append("## 关键建议总结")
-        report.append("")
+        yield _flush(report)
+        report.append("## 关键建议总结\n")
         
         # 出发时间建议
         report.append("### 出发时间")
-        for day_plan in days:
+        for day_plan, buckets in zip(days, day_buckets):
             day_num = day_plan.get("day", 1)
-            segments = day_plan.get("segments", [])
-            morning_seg = next((s for s in segments if s.get("time_period") == "morning" or (s.get("departure_time") and "08" <= s.get("departure_time", "")[:2] <= "09")), None)
+            # 早高峰建议只针对 08-09 点出发的路段（上午分组覆盖到 12 点）
+            morning_seg = next(
+                (
+                    norm for norm in buckets["morning"]
+                    if norm["seg"].get("time_period") == "morning" or "08" <= norm["dep"][:2] <= "09"
+                ),
+                None
+            )
             if morning_seg:
-                dep_time = morning_seg.get("departure_time", "")
-                is_rush = morning_seg.get("is_rush_hour", False)
-                if is_rush:
+                dep_time = morning_seg["dep"]
+                if morning_seg["is_rush_hour"]:
                     report.append(f"- **第{day_num}天**：**{dep_time}前出发**（关键！避开早高峰）")
                 else:
                     report.append(f"- **第{day_num}天**：{dep_time or '08:30'}后出发（避开早高峰）")
@@ -413,53 +605,88 @@ class ReportGenerator:
         report.append("")
         
         # 交通风险规避
-        report.append("### 交通风险规避")
-        report.append("1. **避开高峰时段**：07:00-09:00，16:30-18:30")
-        report.append("2. **早出发**：建议在高峰前或高峰后出发")
-        report.append("3. **预留缓冲**：每天至少1小时机动时间")
-        report.append("4. **选择最优路线**：优先选择避开拥堵的路线")
-        report.append("")
-        
-        report.append("---")
-        report.append("")
+        report.append(_RISK_GUIDE_BLOCK)
         
         # Data Source
-        report.append("## 数据来源")
-        report.append("")
-        report.append("- **地理编码**：Google Maps Geocoding API")
-        report.append("- **路线规划**：Google Maps Directions API")
-        report.append("- **距离矩阵**：Google Maps Distance Matrix API")
-        report.append("- **地点搜索**：Google Maps Places API")
-        report.append("")
-        report.append(f"**生成时间**：基于实时API数据")
-        report.append(f"**坐标系统**：WGS84（Google Maps标准）")
-        report.append("")
-        report.append("---")
-        report.append("")
+        yield _flush(report)
+        report.append(_DATA_SOURCE_BLOCK)
         
         # 注意事项
-        report.append("## 注意事项")
-        report.append("")
-        report.append("1. **实际交通时间可能因拥堵而延长**：建议预留20-30%额外时间")
-        report.append("2. **商务会面可能延长时间**：机动缓冲时段很重要")
-        report.append("3. **天气因素**：雨季可能影响交通，建议关注天气预报")
-        report.append("4. **司机熟悉路况**：包车司机应能提供实时路线调整建议")
-        report.append("5. **收费公路**：部分路线需经过收费公路，准备现金或电子支付")
-        report.append("")
+        report.append(_NOTES_BLOCK)
         
         if request.get("notes"):
-            report.append("## 其他备注")
-            report.append("")
-            report.append(request["notes"])
-            report.append("")
+            report.append(f"## 其他备注\n\n{request['notes']}\n")
         
-        report.append("---")
-        report.append("")
-        report.append(f"**文档版本**：v1.0  ")
-        report.append(f"**最后更新**：{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}  ")
-        report.append("")
+        report.append(
+            f"---\n"
+            f"\n"
+            f"**文档版本**：v1.0  \n"
+            f"**最后更新**：{now_str}  \n"
+        )
         
-        return "\n".join(report)
+        yield "\n".join(report)
+    
+    def _longest_segment_km(self, days: List[Dict[str, Any]]) -> float:
+        """
+        Longest single segment across all days, in kilometers
+        
+        Uses distance_meters when present; only falls back to parsing the
+        localized distance_text if no segment carries a numeric distance.
+        """
+        best_m = max(
+            (seg.get("distance_meters") or 0 for day in days for seg in day.get("segments", [])),
+            default=0
+        )
+        if best_m > 0:
+            return best_m / 1000
+        
+        best = 0.0
+        for day in days:
+            for seg in day.get("segments", []):
+                text = seg.get("distance_text")
+                if not text or ("km" not in text and "公里" not in text):
+                    continue
+                try:
+                    value = float(text.replace("km", "").replace("公里", "").strip())
+                except ValueError:
+                    continue
+                if value > best:
+                    best = value
+        return best
+    
+    def _bucket_segments(self, segments: List[Dict[str, Any]]) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        Classify segments into morning/lunch/afternoon in a single pass
+        
+        Each segment is normalized once into a dict of its commonly read
+        fields (the original segment is kept under "seg"). A segment may
+        land in more than one bucket (e.g. a 12:00 lunch departure is
+        listed under both morning and lunch).
+        """
+        buckets = {"morning": [], "lunch": [], "afternoon": []}
+        for s in segments:
+            norm = {
+                "seg": s,
+                "dep": s.get("departure_time") or "",
+                "arr": s.get("arrival_time") or "",
+                "to": s.get("to_location") or "",
+                "from": s.get("from_location") or "",
+                "act": s.get("activity_description") or "",
+                "dist_text": s.get("distance_text") or "",
+                "dur_text": s.get("duration_text") or "",
+                "is_required": s.get("is_required", False),
+                "is_rush_hour": s.get("is_rush_hour", False)
+            }
+            norm["late_departure"] = "16:30" <= norm["dep"] <= "18:00"
+            tp = s.get("time_period")
+            hh = norm["dep"][:2]
+            if tp == "morning" or "08" <= hh <= "12":
+                buckets["morning"].append(norm)
+            if tp == "lunch" or "午餐" in norm["act"]:
+                buckets["lunch"].append(norm)
+            if tp == "afternoon" or "13" <= hh <= "18":
+                buckets["afternoon"].append(norm)
+        return buckets
     
     def generate_summary(self, days: List[Dict[str, Any]]) -> Dict[str, Any]:
         """
@@ -471,21 +698,29 @@ class ReportGenerator:
         Returns:
             Summary dictionary
         """
-        total_distance = 0
-        total_duration = 0
-        total_segments = 0
-        high_risk_count = 0
+        segments = [segment for day in days for segment in day.get("segments", [])]
         
-        for day in days:
-            segments = day.get("segments", [])
-            total_segments += len(segments)
-            
-            for segment in segments:
-                total_distance += segment.get("distance_meters", 0)
-                total_duration += segment.get("duration_seconds", 0)
-                
-                if segment.get("risk_level") == "high":
-                    high_risk_count += 1
+        # Flatten the numeric fields once and reduce them in C
+        distances = np.fromiter(
+            (segment.get("distance_meters", 0) for segment in segments),
+            dtype=np.int64,
+            count=len(segments)
+        )
+        durations = np.fromiter(
+            (segment.get("duration_seconds", 0) for segment in segments),
+            dtype=np.int64,
+            count=len(segments)
+        )
+        is_high = np.fromiter(
+            (segment.get("risk_level") == "high" for segment in segments),
+            dtype=np.uint8,
+            count=len(segments)
+        )
+        
+        total_distance, total_duration, high_risk_count = (
+            int(v) for v in _reduce_segments(distances, durations, is_high)
+        )
+        total_segments = distances.size
         
         return {
             "total_distance_meters": total_distance,
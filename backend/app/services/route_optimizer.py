@@ -1,8 +1,93 @@
 """Route optimization logic"""
 
-from typing import List, Dict, Any, Optional
-from datetime import datetime, timedelta
-import math
+from typing import List, Dict, Any, Optional, Tuple
+from datetime import datetime
+import functools
+import sys
+import numpy as np
+
+try:
+    from scipy.sparse import csr_matrix
+    SCIPY_AVAILABLE = True
+except ImportError:
+    SCIPY_AVAILABLE = False
+
+from app.services.route_optimizer_numba import _nn_route, _two_opt
+
+# 地点数达到该值且安装了 scipy 时改用 CSR 稀疏距离矩阵
+_SPARSE_MIN_LOCATIONS = 200
+
+
+# 风险说明模板（原因带数字时用预先绑定的 str.format）
+_CAUSE_OVER_LIMIT = "单程车程 {:.1f} 分钟超过限制 {} 分钟".format
+_CAUSE_NEAR_LIMIT = "单程车程 {:.1f} 分钟接近限制 {} 分钟".format
+_CAUSE_RUSH = "高峰时段车程 {:.1f} 分钟，可能延误商务会面".format
+_CAUSE_RUSH_DELAY = "，交通延迟约 {:.0f} 分钟".format
+_CAUSE_DELAY = "交通延迟约 {:.0f} 分钟".format
+_CAUSE_LOW = "车程 {:.1f} 分钟，风险较低".format
+
+_MITIGATION_OVER_LIMIT = "建议提前出发或选择更近的地点，拆分行程"
+_MITIGATION_NEAR_LIMIT = "建议预留额外时间，避开高峰时段"
+_MITIGATION_RUSH = "建议提前出发避开高峰，或选择非高峰时段"
+_MITIGATION_DELAY = "建议预留缓冲时间，避开拥堵路段"
+_MITIGATION_LOW = "按计划执行即可"
+
+
+def _intern(value: Any) -> Any:
+    """Intern location names so repeated dict lookups compare by identity"""
+    return sys.intern(value) if isinstance(value, str) else value
+
+
+def _parse_hhmm(time_str: str) -> Optional[int]:
+    """Parse "HH:MM" into minutes since midnight (None if malformed)"""
+    try:
+        hour, minute = map(int, time_str.split(':'))
+        return hour * 60 + minute
+    except (ValueError, AttributeError):
+        return None
+
+
+def _format_hhmm(minutes: int) -> str:
+    """Format minutes since midnight as "HH:MM" (wraps past midnight)"""
+    minutes %= 1440
+    return f"{minutes // 60:02d}:{minutes % 60:02d}"
+
+
+def _rush_window(start: str, end: str) -> Tuple[int, int]:
+    """Rush-hour window in minutes since midnight (empty if either end is malformed)"""
+    start_minutes = _parse_hhmm(start)
+    end_minutes = _parse_hhmm(end)
+    if start_minutes is None or end_minutes is None:
+        return 1, 0
+    return start_minutes, end_minutes
+
+
+@functools.lru_cache(maxsize=32)
+def _rush_mask(
+    morning_start: str,
+    morning_end: str,
+    evening_start: str,
+    evening_end: str
+) -> np.ndarray:
+    """Per-minute rush-hour lookup table for one day (index = minutes since midnight)"""
+    mask = np.zeros(1440, dtype=bool)
+    for start, end in (_rush_window(morning_start, morning_end), _rush_window(evening_start, evening_end)):
+        if start <= end and end >= 0:
+            mask[max(start, 0):min(end, 1439) + 1] = True
+    # 缓存共享同一数组，禁止写入
+    mask.flags.writeable = False
+    return mask
+
+
+@functools.lru_cache(maxsize=128)
+def _optimize_cached(
+    locations: Tuple[str, ...],
+    start_location: str,
+    end_location: Optional[str],
+    distances: Tuple[Tuple[Tuple[str, str], float], ...]
+) -> Tuple[str, ...]:
+    """Optimized route per input (RouteOptimizer has no state, so any instance gives the same result)"""
+    return RouteOptimizer()._optimize_impl(locations, start_location, end_location, distances)
 
 
 class RouteOptimizer:
@@ -19,7 +104,7 @@ class RouteOptimizer:
         distance_matrix: List[Dict[str, Any]]
     ) -> List[str]:
         """
-        Optimize route order using nearest neighbor heuristic
+        Optimize route order using nearest neighbor heuristic with 2-opt refinement
         
         Args:
             locations: List of locations to visit
@@ -33,45 +118,233 @@ class RouteOptimizer:
         if not locations:
             return []
         
-        # Build distance lookup
-        distance_map = {}
-        for entry in distance_matrix:
-            if entry.get("status") == "OK" or "distance_meters" in entry:
-                origin = entry["origin"]
-                destination = entry["destination"]
-                if origin not in distance_map:
-                    distance_map[origin] = {}
-                distance_map[origin][destination] = entry.get("distance_meters", float('inf'))
-        
-        # Nearest neighbor algorithm
-        unvisited = set(locations)
-        current = start_location
-        route = [current]
-        
-        while unvisited:
-            nearest = None
-            nearest_distance = float('inf')
+        # 只有一个地点时无需排序，也不必构建距离表
+        if len(locations) == 1:
+            route = [start_location, locations[0]]
+            if end_location and end_location != route[-1]:
+                route.append(end_location)
+            return route
+        
+        # 相同输入直接复用缓存结果（RouteOptimizer 无可变状态）
+        distances = tuple(self._build_distance_map(distance_matrix).items())
+        locations = tuple(_intern(loc) for loc in locations)
+        return list(_optimize_cached(locations, _intern(start_location), end_location, distances))
+    
+    def _optimize_impl(
+        self,
+        locations: Tuple[str, ...],
+        start_location: str,
+        end_location: Optional[str],
+        distances: Tuple[Tuple[Tuple[str, str], float], ...]
+    ) -> Tuple[str, ...]:
+        """
+        Body of optimize_route_order (cached through _optimize_cached)
+        
+        Args:
+            locations: Locations to visit
+            start_location: Starting location
+            end_location: Ending location (optional)
+            distances: ((origin, destination), meters) pairs
             
-            for location in unvisited:
-                distance = distance_map.get(current, {}).get(location, float('inf'))
-                if distance < nearest_distance:
-                    nearest_distance = distance
-                    nearest = location
+        Returns:
+            Optimized order of locations
+        """
+        if SCIPY_AVAILABLE and len(locations) >= _SPARSE_MIN_LOCATIONS:
+            # 地点很多时用稀疏矩阵，内存随已知路段数增长；2-opt 代价过高，跳过
+            names, index, D = self._build_sparse_matrix(locations, start_location, dict(distances))
+            unvisited = np.zeros(len(names), dtype=np.bool_)
+            unvisited[[index[loc] for loc in locations]] = True
+            order = self._sparse_nn_route(D, index[start_location], unvisited)
+            route = [start_location]
+            route.extend(names[i] for i in order)
+            # If no path found, add remaining in order
+            route.extend(names[i] for i in np.flatnonzero(unvisited))
+            # Add end location if specified and not already in route
+            if end_location and end_location != route[-1]:
+                route.append(end_location)
+        else:
+            # Build dense distance matrix（终点也编入矩阵，2-opt 计入最后一段）
+            names, index, D = self._build_dense_matrix(locations, start_location, dict(distances), end_location)
+            visit = np.zeros(len(names), dtype=np.bool_)
+            visit[[index[loc] for loc in locations]] = True
+            path = self.optimize_route_order_np(
+                D, index[start_location], end_idx=index.get(end_location), visit=visit
+            )
+            route = [names[i] for i in path]
+        
+        return tuple(route)
+    
+    def optimize_route_order_np(
+        self,
+        D: np.ndarray,
+        start_idx: int,
+        end_idx: Optional[int] = None,
+        visit: Optional[np.ndarray] = None
+    ) -> np.ndarray:
+        """
+        Optimize route order over a dense distance matrix
+        
+        Args:
+            D: n x n distance matrix in meters (inf where no route is known)
+            start_idx: Index of the starting location
+            end_idx: Index of the ending location (optional)
+            visit: Boolean mask of locations to visit (default: every index
+                except start_idx and end_idx)
             
-            if nearest:
-                route.append(nearest)
-                unvisited.remove(nearest)
-                current = nearest
-            else:
-                # If no path found, add remaining in order
-                route.extend(unvisited)
-                break
+        Returns:
+            Matrix indices in visiting order, starting with start_idx
+        """
+        D = np.asarray(D, dtype=np.float32)
+        if visit is None:
+            unvisited = np.ones(D.shape[0], dtype=np.bool_)
+            unvisited[start_idx] = False
+        else:
+            unvisited = np.array(visit, dtype=np.bool_)
+        # 终点固定放在最后，不参与途中排序
+        if end_idx is not None:
+            unvisited[end_idx] = False
+        
+        # Nearest neighbor algorithm（安装 numba 时为编译后的内核）
+        order = _nn_route(D, start_idx, unvisited)
+        
+        path = np.empty(len(order) + 1, dtype=np.int64)
+        path[0] = start_idx
+        path[1:] = order
+        remaining = np.flatnonzero(unvisited)
+        if len(path) < _SPARSE_MIN_LOCATIONS:
+            # 2-opt 改进（起点固定，最多 50 轮）；终点紧跟路径末尾时一并计入最后一段
+            end = end_idx if end_idx is not None and not remaining.size else -1
+            path = _two_opt(path, D, 50, end)
+        
+        # If no path found, add remaining in order
+        path = np.concatenate([path, remaining])
         
         # Add end location if specified and not already in route
-        if end_location and end_location != route[-1]:
-            route.append(end_location)
+        if end_idx is not None and end_idx != path[-1]:
+            path = np.append(path, end_idx)
+        return path
+    
+    def _build_dense_matrix(
+        self,
+        locations: Tuple[str, ...],
+        start_location: str,
+        distance_map: Dict[Tuple[str, str], float],
+        end_location: Optional[str] = None
+    ) -> Tuple[List[str], Dict[str, int], np.ndarray]:
+        """
+        Build a dense distance matrix indexed by integer location IDs
+        
+        Args:
+            locations: Locations to visit
+            start_location: Starting location
+            distance_map: Distance in meters keyed by (origin, destination)
+            end_location: Ending location (optional)
+            
+        Returns:
+            (names, index, D): location names by ID, name -> ID lookup and
+            an n x n float32 matrix in meters (inf where no route is known)
+        """
+        names = list(dict.fromkeys([start_location, *locations, *([end_location] if end_location else [])]))
+        index = {loc: i for i, loc in enumerate(names)}
+        D = np.full((len(names), len(names)), np.inf, dtype=np.float32)
+        
+        for (origin, destination), meters in distance_map.items():
+            i = index.get(origin)
+            j = index.get(destination)
+            if i is not None and j is not None:
+                D[i, j] = meters
+        
+        return names, index, D
+    
+    def _build_sparse_matrix(
+        self,
+        locations: Tuple[str, ...],
+        start_location: str,
+        distance_map: Dict[Tuple[str, str], float]
+    ) -> Tuple[List[str], Dict[str, int], "csr_matrix"]:
+        """
+        Build a CSR distance matrix holding only the known routes
+        
+        Args:
+            locations: Locations to visit
+            start_location: Starting location
+            distance_map: Distance in meters keyed by (origin, destination)
+            
+        Returns:
+            (names, index, D): location names by ID, name -> ID lookup and
+            an n x n CSR matrix in meters (missing entries mean no route)
+        """
+        names = list(dict.fromkeys([start_location, *locations]))
+        index = {loc: i for i, loc in enumerate(names)}
+        
+        rows, cols, data = [], [], []
+        for (origin, destination), meters in distance_map.items():
+            i = index.get(origin)
+            j = index.get(destination)
+            if i is not None and j is not None:
+                rows.append(i)
+                cols.append(j)
+                data.append(meters)
+        
+        D = csr_matrix(
+            (np.array(data, dtype=np.float32), (np.array(rows, dtype=np.int64), np.array(cols, dtype=np.int64))),
+            shape=(len(names), len(names))
+        )
+        D.sort_indices()
+        return names, index, D
+    
+    def _sparse_nn_route(
+        self,
+        D: "csr_matrix",
+        start: int,
+        unvisited: np.ndarray
+    ) -> List[int]:
+        """
+        Nearest neighbor walk over a CSR distance matrix
+        
+        Args:
+            D: CSR distance matrix (sorted indices)
+            start: Index of the starting location
+            unvisited: Boolean mask of locations to visit, updated in place
+            
+        Returns:
+            Indices in visiting order (stops early when nothing is reachable)
+        """
+        order = []
+        current = start
+        while True:
+            lo, hi = D.indptr[current], D.indptr[current + 1]
+            neighbors = D.indices[lo:hi]
+            candidates = unvisited[neighbors]
+            if not candidates.any():
+                break
+            
+            nearest = int(neighbors[candidates][D.data[lo:hi][candidates].argmin()])
+            order.append(nearest)
+            unvisited[nearest] = False
+            current = nearest
+        
+        return order
+    
+    def _build_distance_map(
+        self,
+        distance_matrix: List[Dict[str, Any]]
+    ) -> Dict[Tuple[str, str], float]:
+        """
+        Build a flat (origin, destination) -> meters lookup
         
-        return route
+        Args:
+            distance_matrix: Distance matrix data
+            
+        Returns:
+            Distance in meters keyed by (origin, destination); pairs
+            without a distance are left out
+        """
+        return {
+            (_intern(entry["origin"]), _intern(entry["destination"])): entry["distance_meters"]
+            for entry in distance_matrix
+            if "distance_meters" in entry
+        }
     
     def is_rush_hour(
         self,
@@ -139,26 +412,26 @@ class RouteOptimizer:
         
         if actual_duration > max_seconds:
             risk_level = "high"
-            risk_cause = f"单程车程 {duration_minutes:.1f} 分钟超过限制 {max_travel_time_minutes} 分钟"
-            mitigation = "建议提前出发或选择更近的地点，拆分行程"
+            risk_cause = _CAUSE_OVER_LIMIT(duration_minutes, max_travel_time_minutes)
+            mitigation = _MITIGATION_OVER_LIMIT
         elif actual_duration > max_seconds * 0.8:
             risk_level = "medium"
-            risk_cause = f"单程车程 {duration_minutes:.1f} 分钟接近限制 {max_travel_time_minutes} 分钟"
-            mitigation = "建议预留额外时间，避开高峰时段"
+            risk_cause = _CAUSE_NEAR_LIMIT(duration_minutes, max_travel_time_minutes)
+            mitigation = _MITIGATION_NEAR_LIMIT
         elif is_rush_hour and duration_minutes > 30:
             risk_level = "medium"
-            risk_cause = f"高峰时段车程 {duration_minutes:.1f} 分钟，可能延误商务会面"
+            risk_cause = _CAUSE_RUSH(duration_minutes)
             if traffic_delay_minutes > 10:
-                risk_cause += f"，交通延迟约 {traffic_delay_minutes:.0f} 分钟"
-            mitigation = "建议提前出发避开高峰，或选择非高峰时段"
+                risk_cause += _CAUSE_RUSH_DELAY(traffic_delay_minutes)
+            mitigation = _MITIGATION_RUSH
         elif traffic_delay_minutes > 20:
             risk_level = "medium"
-            risk_cause = f"交通延迟约 {traffic_delay_minutes:.0f} 分钟"
-            mitigation = "建议预留缓冲时间，避开拥堵路段"
+            risk_cause = _CAUSE_DELAY(traffic_delay_minutes)
+            mitigation = _MITIGATION_DELAY
         else:
             risk_level = "low"
-            risk_cause = f"车程 {duration_minutes:.1f} 分钟，风险较低"
-            mitigation = "按计划执行即可"
+            risk_cause = _CAUSE_LOW(duration_minutes)
+            mitigation = _MITIGATION_LOW
         
         return {
             "level": risk_level,
@@ -169,6 +442,82 @@ class RouteOptimizer:
             "is_rush_hour": is_rush_hour
         }
     
+    def _assess_risk_batch(
+        self,
+        duration_seconds: List[int],
+        duration_in_traffic_seconds: List[Optional[int]],
+        is_rush_hour: List[bool],
+        max_travel_time_minutes: int = 120
+    ) -> List[Dict[str, Any]]:
+        """
+        Assess risk levels for many segments at once
+        
+        Same rules and output as assess_risk_level, but the level of every
+        segment is classified in one NumPy pass.
+        
+        Args:
+            duration_seconds: Base travel durations in seconds
+            duration_in_traffic_seconds: Durations in traffic (None/0 if unavailable)
+            is_rush_hour: Rush-hour flag per segment
+            max_travel_time_minutes: Maximum allowed travel time in minutes
+            
+        Returns:
+            One risk assessment dictionary per segment
+        """
+        base = np.array(duration_seconds, dtype=np.float64)
+        traffic = np.array([t or 0 for t in duration_in_traffic_seconds], dtype=np.float64)
+        has_traffic = traffic != 0
+        actual = np.where(has_traffic, traffic, base)
+        minutes = actual / 60
+        delay = np.where(has_traffic, (traffic - base) / 60, 0.0)
+        rush = np.array(is_rush_hour, dtype=bool)
+        max_seconds = max_travel_time_minutes * 60
+        
+        # 4 超过限制 / 3 接近限制 / 2 高峰时段 / 1 交通延迟 / 0 低风险（与逐段判断顺序一致）
+        codes = np.select(
+            [actual > max_seconds, actual > max_seconds * 0.8, rush & (minutes > 30), delay > 20],
+            [4, 3, 2, 1],
+            default=0
+        )
+        
+        assessments = []
+        for code, duration_minutes, traffic_delay_minutes, with_traffic, is_rush in zip(
+            codes.tolist(), minutes.tolist(), delay.tolist(), has_traffic.tolist(), is_rush_hour
+        ):
+            if code == 4:
+                risk_level = "high"
+                risk_cause = _CAUSE_OVER_LIMIT(duration_minutes, max_travel_time_minutes)
+                mitigation = _MITIGATION_OVER_LIMIT
+            elif code == 3:
+                risk_level = "medium"
+                risk_cause = _CAUSE_NEAR_LIMIT(duration_minutes, max_travel_time_minutes)
+                mitigation = _MITIGATION_NEAR_LIMIT
+            elif code == 2:
+                risk_level = "medium"
+                risk_cause = _CAUSE_RUSH(duration_minutes)
+                if traffic_delay_minutes > 10:
+                    risk_cause += _CAUSE_RUSH_DELAY(traffic_delay_minutes)
+                mitigation = _MITIGATION_RUSH
+            elif code == 1:
+                risk_level = "medium"
+                risk_cause = _CAUSE_DELAY(traffic_delay_minutes)
+                mitigation = _MITIGATION_DELAY
+            else:
+                risk_level = "low"
+                risk_cause = _CAUSE_LOW(duration_minutes)
+                mitigation = _MITIGATION_LOW
+            
+            assessments.append({
+                "level": risk_level,
+                "cause": risk_cause,
+                "mitigation": mitigation,
+                "duration_minutes": duration_minutes,
+                "traffic_delay_minutes": round(traffic_delay_minutes, 1) if with_traffic else 0,
+                "is_rush_hour": is_rush
+            })
+        
+        return assessments
+    
     def calculate_schedule(
         self,
         route_segments: List[Dict[str, Any]],
@@ -186,50 +535,54 @@ class RouteOptimizer:
         Returns:
             Segments with calculated departure and arrival times
         """
-        current_time = datetime.strptime(start_time, "%H:%M")
+        # 时间以当天分钟数表示，只在输出时格式化
+        start = datetime.strptime(start_time, "%H:%M")
+        start_minutes = start.hour * 60 + start.minute
         scheduled_segments = []
         
-        for segment in route_segments:
-            duration_seconds = segment.get("duration_seconds", 0)
-            duration_minutes = math.ceil(duration_seconds / 60)
-            
-            # Add visit time (default 60 minutes per location)
-            visit_minutes = segment.get("visit_minutes", 60)
-            
-            # Check if rush hour
-            departure_str = current_time.strftime("%H:%M")
-            is_rush_morning = self.is_rush_hour(
-                departure_str,
-                constraints.get("rush_hour_start_morning", "07:00"),
-                constraints.get("rush_hour_end_morning", "09:00")
-            )
-            is_rush_evening = self.is_rush_hour(
-                departure_str,
-                constraints.get("rush_hour_start_evening", "16:30"),
-                constraints.get("rush_hour_end_evening", "18:30")
-            )
-            is_rush = is_rush_morning or is_rush_evening
-            
-            # Calculate arrival time
-            arrival_time = current_time + timedelta(minutes=duration_minutes)
-            arrival_str = arrival_time.strftime("%H:%M")
-            
-            # Calculate departure from this location
-            departure_from_location = arrival_time + timedelta(minutes=visit_minutes)
-            
-            # Assess risk (enhanced with traffic data)
-            duration_in_traffic = segment.get("duration_in_traffic_seconds") or segment.get("duration_seconds", 0)
-            risk_assessment = self.assess_risk_level(
-                duration_seconds,
-                duration_in_traffic,
-                is_rush,
-                constraints.get("max_travel_time_minutes", 120)
-            )
-            
+        # 高峰时段按分钟查表（同一组约束只构建一次）
+        rush_mask = _rush_mask(
+            constraints.get("rush_hour_start_morning", "07:00"),
+            constraints.get("rush_hour_end_morning", "09:00"),
+            constraints.get("rush_hour_start_evening", "16:30"),
+            constraints.get("rush_hour_end_evening", "18:30")
+        )
+        
+        # 出发/到达时间：对 (车程 + 停留) 做一次累加
+        base_seconds = [segment.get("duration_seconds", 0) for segment in route_segments]
+        duration_minutes = (np.array(base_seconds, dtype=np.int64) + 59) // 60
+        
+        # Add visit time (default 60 minutes per location)
+        visits = [segment.get("visit_minutes", 60) for segment in route_segments]
+        steps = duration_minutes + np.array(visits, dtype=np.int64)
+        departures = start_minutes + np.cumsum(steps) - steps
+        arrivals = departures + duration_minutes
+        
+        # Check if rush hour
+        rush = rush_mask[departures % 1440]
+        
+        rush_flags = rush.tolist()
+        
+        # Assess risk (enhanced with traffic data)
+        traffic_seconds = [
+            segment.get("duration_in_traffic_seconds") or base
+            for segment, base in zip(route_segments, base_seconds)
+        ]
+        risk_assessments = self._assess_risk_batch(
+            base_seconds,
+            traffic_seconds,
+            rush_flags,
+            constraints.get("max_travel_time_minutes", 120)
+        )
+        
+        for segment, departure, arrival, is_rush, visit_minutes, duration_in_traffic, risk_assessment in zip(
+            route_segments, departures.tolist(), arrivals.tolist(), rush_flags, visits,
+            traffic_seconds, risk_assessments
+        ):
             segment_scheduled = {
                 **segment,
-                "departure_time": departure_str,
-                "arrival_time": arrival_str,
+                "departure_time": _format_hhmm(departure),
+                "arrival_time": _format_hhmm(arrival),
                 "is_rush_hour": is_rush,
                 "risk_level": risk_assessment["level"],
                 "risk_cause": risk_assessment["cause"],
@@ -241,7 +594,6 @@ class RouteOptimizer:
             }
             
             scheduled_segments.append(segment_scheduled)
-            current_time = departure_from_location
         
         return scheduled_segments
     
@@ -260,44 +612,41 @@ class RouteOptimizer:
         Returns:
             List of backtracking issues found
         """
+        # 少于两段时不存在回头路
+        if len(route_segments) < 2:
+            return []
+        
         backtracking_issues = []
         
         # Build distance lookup
-        distance_map = {}
-        for entry in distance_matrix:
-            if "distance_meters" in entry:
-                origin = entry["origin"]
-                destination = entry["destination"]
-                if origin not in distance_map:
-                    distance_map[origin] = {}
-                distance_map[origin][destination] = entry["distance_meters"]
+        distance_map = self._build_distance_map(distance_matrix)
+        inf = float('inf')
         
         # Check for obvious backtracking (going back to a location near previous one)
-        for i in range(1, len(route_segments)):
-            prev_segment = route_segments[i-1]
-            curr_segment = route_segments[i]
-            
-            prev_from = prev_segment.get("from_location")
-            prev_to = prev_segment.get("to_location")
-            curr_from = curr_segment.get("from_location")
-            curr_to = curr_segment.get("to_location")
-            
-            # If we're going back towards a previous location
-            if prev_from and curr_to:
-                # Check distance between prev_from and curr_to
-                # If it's shorter than going through curr_from, there's backtracking
-                direct_distance = distance_map.get(prev_from, {}).get(curr_to, float('inf'))
-                indirect_distance = (
-                    distance_map.get(prev_from, {}).get(curr_from, float('inf')) +
-                    distance_map.get(curr_from, {}).get(curr_to, float('inf'))
-                )
-                
-                if direct_distance < indirect_distance * 0.7:  # 30% shorter
-                    backtracking_issues.append({
-                        "segment_index": i,
-                        "issue": f"Possible backtracking: {curr_from} → {curr_to} might be shorter via {prev_from}",
-                        "suggestion": f"Consider going directly from {prev_from} to {curr_to}"
-                    })
+        froms = [_intern(segment.get("from_location")) for segment in route_segments]
+        tos = [_intern(segment.get("to_location")) for segment in route_segments]
+        pairs = range(1, len(route_segments))
+        
+        # Distance between prev_from and curr_to, versus going through curr_from
+        direct_distance = np.array(
+            [distance_map.get((froms[i-1], tos[i]), inf) for i in pairs], dtype=np.float64
+        )
+        indirect_distance = (
+            np.array([distance_map.get((froms[i-1], froms[i]), inf) for i in pairs], dtype=np.float64) +
+            np.array([distance_map.get((froms[i], tos[i]), inf) for i in pairs], dtype=np.float64)
+        )
+        checked = np.array([bool(froms[i-1] and tos[i]) for i in pairs], dtype=bool)
+        
+        # If it's shorter than going through curr_from, there's backtracking (30% shorter)
+        backtracking = checked & (direct_distance < indirect_distance * 0.7)
+        
+        for i in (np.flatnonzero(backtracking) + 1).tolist():
+            prev_from, curr_from, curr_to = froms[i-1], froms[i], tos[i]
+            backtracking_issues.append({
+                "segment_index": i,
+                "issue": f"Possible backtracking: {curr_from} → {curr_to} might be shorter via {prev_from}",
+                "suggestion": f"Consider going directly from {prev_from} to {curr_to}"
+            })
         
         return backtracking_issues
 
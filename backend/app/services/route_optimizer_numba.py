@@ -0,0 +1,106 @@
+"""Compiled kernels for route optimization"""
+
+import numpy as np
+
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+
+if NUMBA_AVAILABLE:
+    @njit(cache=True)
+    def _nn_route(D, start, unvisited):
+        """
+        Nearest neighbor walk over a dense distance matrix (compiled by numba)
+
+        Args:
+            D: n x n distance matrix (inf where no route is known)
+            start: Index of the starting location
+            unvisited: Boolean mask of locations to visit, updated in place
+
+        Returns:
+            Indices in visiting order (stops early when nothing is reachable)
+        """
+        n = D.shape[0]
+        route = np.empty(n, np.int64)
+        k = 0
+        cur = start
+        while True:
+            # 在未访问的地点中找最近点（距离相同时取下标小者）
+            best = -1
+            best_d = np.inf
+            for j in range(n):
+                if unvisited[j] and D[cur, j] < best_d:
+                    best = j
+                    best_d = D[cur, j]
+            if best < 0:
+                break
+            route[k] = best
+            k += 1
+            unvisited[best] = False
+            cur = best
+        return route[:k]
+else:
+    def _nn_route(D, start, unvisited):
+        """Nearest neighbor walk over a dense distance matrix (NumPy fallback)"""
+        route = []
+        cur = start
+        while unvisited.any():
+            row_masked = np.where(unvisited, D[cur], np.inf)
+            best = int(row_masked.argmin())
+            if row_masked[best] == np.inf:
+                break
+            route.append(best)
+            unvisited[best] = False
+            cur = best
+        return np.array(route, dtype=np.int64)
+
+
+def _two_opt(route, D, max_iter, end):
+    """
+    Improve a path in place with 2-opt segment reversals (first node fixed)
+
+    The distance matrix may be asymmetric, so each candidate reversal is
+    scored on the full reversed segment rather than just the two end edges.
+    When end >= 0 the path is scored as if it continued to that fixed last
+    node, so reversals that touch the tail also account for the final hop.
+
+    Args:
+        route: Path as an int array of matrix indices, route[0] is the start
+        D: n x n distance matrix (inf where no route is known)
+        max_iter: Maximum number of improvement passes
+        end: Index of the fixed ending location appended after route (-1: none)
+
+    Returns:
+        The improved route (same array)
+    """
+    n = route.shape[0]
+    for _ in range(max_iter):
+        improved = False
+        for i in range(1, n - 1):
+            for j in range(i + 1, n):
+                a = route[i - 1]
+                # float64 累加，避免 float32 舍入误差让“等长”交换被误判为改进
+                old = np.float64(D[a, route[i]])
+                new = np.float64(D[a, route[j]])
+                for k in range(i, j):
+                    old += D[route[k], route[k + 1]]
+                    new += D[route[k + 1], route[k]]
+                if j + 1 < n:
+                    old += D[route[j], route[j + 1]]
+                    new += D[route[i], route[j + 1]]
+                elif end >= 0:
+                    old += D[route[j], end]
+                    new += D[route[i], end]
+                if new < old - 1e-6:
+                    route[i:j + 1] = route[i:j + 1][::-1].copy()
+                    improved = True
+        if not improved:
+            break
+    return route
+
+
+if NUMBA_AVAILABLE:
+    _two_opt = njit(cache=True)(_two_opt)
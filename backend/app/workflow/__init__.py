@@ -28,7 +28,8 @@ from .nodes import (
     optimize_route_node,
     assess_traffic_risks_node,
     generate_alternatives_node,
-    generate_report_node
+    generate_report_node,
+    plan_parallel
 )
 
 __all__ = [
@@ -39,6 +40,7 @@ __all__ = [
     "optimize_route_node",
     "assess_traffic_risks_node",
     "generate_alternatives_node",
-    "generate_report_node"
+    "generate_report_node",
+    "plan_parallel"
 ]
 
@@ -16,13 +16,140 @@ Key Features:
 - Context Preparation: Prepare context for next nodes
 """
 
-from typing import Dict, Any, Optional, List
+import asyncio
+import hashlib
+import json
+import re
+import time
+from dataclasses import dataclass
+from typing import Dict, Any, Optional, List, Tuple
 from datetime import datetime
-from app.services.context_manager import PlanningContext, ContextExtractor, PlanningState
+import numpy as np
+from cachetools import LRUCache, TTLCache
+from app.services.context_manager import PlanningContext, PlanningState
 from app.services.maps_service import MapsService
+from app.services.persistent_cache import SQLiteCache
 from app.services.route_optimizer import RouteOptimizer
 from app.services.report_generator import ReportGenerator
 
+# 地理编码并发上限
+_GEOCODE_CONCURRENCY = 10
+
+# 进程级缓存，跨会话共享（只在事件循环线程中读写）
+_GEOCODE_CACHE: TTLCache = TTLCache(maxsize=50_000, ttl=7 * 86400)
+_PLACES_CACHE: TTLCache = TTLCache(maxsize=10_000, ttl=86400)
+_ROUTE_CACHE: LRUCache = LRUCache(maxsize=512)
+_SCHEDULE_CACHE: LRUCache = LRUCache(maxsize=512)
+# 备选路线含实时路况，只缓存 5 分钟
+_ALTERNATIVES_CACHE: TTLCache = TTLCache(maxsize=2048, ttl=300)
+
+# 磁盘缓存（SQLite），进程重启后仍可复用地理编码与地点搜索结果；
+# 读写走 aget/aset，磁盘 I/O 不占用事件循环
+_GEOCODE_STORE = SQLiteCache(table="geocode", ttl=30 * 86400)
+_PLACES_STORE = SQLiteCache(table="places", ttl=86400)
+
+# 正在请求中的地理编码（规范化地址 -> Future），并发的相同请求共用一次 API 调用
+_GEOCODE_INFLIGHT: Dict[str, asyncio.Future] = {}
+
+# 路段从距离矩阵条目中复制的字段及默认值
+_SEGMENT_FIELDS = (
+    ("distance_meters", 0),
+    ("distance_text", ""),
+    ("duration_seconds", 0),
+    ("duration_text", ""),
+    ("duration_in_traffic_seconds", None),
+    ("duration_in_traffic_text", ""),
+    ("traffic_delay_minutes", 0)
+)
+
+# Distance Matrix API 单次请求上限：起点/终点各 25 个，共 100 个元素
+_DM_MAX_LOCATIONS = 25
+_DM_MAX_ELEMENTS = 100
+_DM_CONCURRENCY = 5
+
+# plan_parallel 中每个上游 API 的并发上限
+_PARALLEL_CONCURRENCY = 8
+# plan_parallel 运行期间的阶段名（子节点不各自设置，避免并发覆盖）
+_PARALLEL_STAGE = "searching_places_and_alternatives"
+
+
+class _RateLimiter:
+    """Token bucket shared by every Maps API call made from the workflow nodes"""
+    
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.capacity = burst
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+        self._lock = asyncio.Lock()
+    
+    async def acquire(self):
+        """Wait until a request may be sent"""
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
+@dataclass
+class RouteSegments:
+    """Route segments in column layout (one list/array per field)"""
+    from_location: List[Any]
+    to_location: List[Any]
+    departure_time: List[Any]
+    duration_in_traffic_text: List[Any]
+    risk_cause: List[Any]
+    risk_mitigation: List[Any]
+    risk_level: np.ndarray
+    distance_meters: np.ndarray
+    duration_seconds: np.ndarray
+    
+    @classmethod
+    def from_records(cls, route_segments: List[Dict[str, Any]]) -> "RouteSegments":
+        """Build the column layout from a list of segment dicts"""
+        return cls(
+            from_location=[segment.get("from_location") for segment in route_segments],
+            to_location=[segment.get("to_location") for segment in route_segments],
+            departure_time=[segment.get("departure_time") for segment in route_segments],
+            duration_in_traffic_text=[segment.get("duration_in_traffic_text") for segment in route_segments],
+            risk_cause=[segment.get("risk_cause") for segment in route_segments],
+            risk_mitigation=[segment.get("risk_mitigation") for segment in route_segments],
+            risk_level=np.array([segment.get("risk_level", "low") for segment in route_segments], dtype=object),
+            distance_meters=np.array([segment.get("distance_meters") or 0 for segment in route_segments], dtype=np.int32),
+            duration_seconds=np.array([segment.get("duration_seconds") or 0 for segment in route_segments], dtype=np.int32)
+        )
+    
+    def __len__(self) -> int:
+        return len(self.from_location)
+    
+    def risk_record(self, i: int) -> Dict[str, Any]:
+        """Risk entry for segment i as reported by assess_traffic_risks_node"""
+        return {
+            "segment_index": i,
+            "from": self.from_location[i],
+            "to": self.to_location[i],
+            "time": self.departure_time[i],
+            "level": self.risk_level[i],
+            "cause": self.risk_cause[i],
+            "mitigation": self.risk_mitigation[i],
+            "duration_in_traffic": self.duration_in_traffic_text[i]
+        }
+
+
+# Google Maps 全局请求预算（默认 50 QPS）
+_MAPS_LIMITER = _RateLimiter(rate=50, burst=50)
+
+
+async def _maps_call(fn, *args, **kwargs):
+    """Call a synchronous MapsService method in a worker thread under the global rate limit"""
+    await _MAPS_LIMITER.acquire()
+    return await asyncio.to_thread(fn, *args, **kwargs)
+
 
 async def understand_requirements_node(
     state: PlanningState,
@@ -50,8 +177,7 @@ async def understand_requirements_node(
         planning_log_entry = {
             "type": "understand_requirements",
             "input": user_input,
-            "status": "success",
-            "timestamp": datetime.now().isoformat()
+            "status": "success"
         }
         
         context.add_planning_log_entry(planning_log_entry)
@@ -63,6 +189,154 @@ async def understand_requirements_node(
         return {"status": "error", "error": str(e), "state": state.to_dict()}
 
 
+async def _geocode_one(
+    context: PlanningContext,
+    maps_service: MapsService,
+    location: str,
+    semaphore: asyncio.Semaphore
+) -> Dict[str, Any]:
+    """
+    Geocode one location, using the caches or an in-flight request when possible
+    
+    Args:
+        context: Planning context
+        maps_service: Maps service instance
+        location: Location address
+        semaphore: Bounds the number of concurrent geocoding requests
+        
+    Returns:
+        Geocoding result
+    """
+    # Check caches first (process-wide, then per-context)
+    key = _normalize_address(location)
+    if key in _GEOCODE_CACHE:
+        result = _GEOCODE_CACHE[key]
+        context.geocode_cache[location] = result
+        return result
+    if location in context.geocode_cache:
+        return context.geocode_cache[location]
+    stored = await _GEOCODE_STORE.aget(key)
+    if stored is not None:
+        _GEOCODE_CACHE[key] = stored
+        context.geocode_cache[location] = stored
+        return stored
+    
+    # 其他会话正在请求同一地址时等待其结果（shield：本调用被取消不影响对方）
+    inflight = _GEOCODE_INFLIGHT.get(key)
+    if inflight is not None:
+        result = await asyncio.shield(inflight)
+        context.geocode_cache[location] = result
+        return result
+    
+    future = asyncio.get_running_loop().create_future()
+    _GEOCODE_INFLIGHT[key] = future
+    try:
+        async with semaphore:
+            result = await _maps_call(maps_service.geocode, location)
+    except BaseException as e:
+        if isinstance(e, asyncio.CancelledError):
+            future.cancel()
+        else:
+            future.set_exception(e)
+            future.exception()  # 没有等待者时不报 "exception was never retrieved"
+        raise
+    finally:
+        _GEOCODE_INFLIGHT.pop(key, None)
+    
+    future.set_result(result)
+    _GEOCODE_CACHE[key] = result
+    await _GEOCODE_STORE.aset(key, result)
+    context.geocode_cache[location] = result
+    return result
+
+
+def _normalize_address(address: str) -> str:
+    """Normalize an address for use as a cache key (case and whitespace)"""
+    return re.sub(r"\s+", " ", address.strip().lower())
+
+
+def _tile(origins: List[str], destinations: List[str]):
+    """
+    Split an origins x destinations matrix into tiles within the API limits
+    
+    Args:
+        origins: List of origin addresses
+        destinations: List of destination addresses
+        
+    Yields:
+        (origin slice, destination slice) per tile
+    """
+    tile_d = min(len(destinations), _DM_MAX_LOCATIONS) or 1
+    tile_o = min(_DM_MAX_LOCATIONS, max(1, _DM_MAX_ELEMENTS // tile_d))
+    for i in range(0, max(len(origins), 1), tile_o):
+        for j in range(0, max(len(destinations), 1), tile_d):
+            yield origins[i:i + tile_o], destinations[j:j + tile_d]
+
+
+async def _fetch_distance_tile(
+    maps_service: MapsService,
+    semaphore: asyncio.Semaphore,
+    origins: List[str],
+    destinations: List[str],
+    departure_time: Optional[datetime],
+    traffic_model: str
+) -> List[Dict[str, Any]]:
+    """Fetch one distance matrix tile in a worker thread"""
+    async with semaphore:
+        return await _maps_call(
+            maps_service.get_distance_matrix,
+            origins=origins,
+            destinations=destinations,
+            mode="driving",
+            departure_time=departure_time,
+            traffic_model=traffic_model
+        )
+
+
+def _route_cache_key(
+    locations: List[str],
+    start_location: str,
+    end_location: Optional[str],
+    distance_matrix: List[Dict[str, Any]]
+) -> bytes:
+    """Stable digest of the inputs that determine the optimized route"""
+    payload = json.dumps(
+        [locations, start_location, end_location, distance_matrix],
+        sort_keys=True,
+        default=str
+    )
+    return hashlib.blake2b(payload.encode(), digest_size=16).digest()
+
+
+def _build_route_segments(
+    optimized_order: List[str],
+    distance_matrix: List[Dict[str, Any]]
+) -> List[Dict[str, Any]]:
+    """
+    Build route segments for consecutive stops from distance matrix entries
+    
+    Args:
+        optimized_order: Optimized order of locations
+        distance_matrix: Distance matrix data
+        
+    Returns:
+        Route segments (hops without a matrix entry are skipped)
+    """
+    # (origin, destination) -> entry；与原先线性查找一致，重复时取第一条
+    index: Dict[tuple, Dict[str, Any]] = {}
+    for entry in distance_matrix:
+        index.setdefault((entry.get("origin"), entry.get("destination")), entry)
+    
+    route_segments = []
+    for from_loc, to_loc in zip(optimized_order, optimized_order[1:]):
+        segment_data = index.get((from_loc, to_loc))
+        if segment_data:
+            segment = {"from_location": from_loc, "to_location": to_loc}
+            segment.update((key, segment_data.get(key, default)) for key, default in _SEGMENT_FIELDS)
+            route_segments.append(segment)
+    return route_segments
+
+
 async def geocode_locations_node(
     state: PlanningState,
     context: PlanningContext,
@@ -89,32 +363,36 @@ async def geocode_locations_node(
         
         geocoded_locations = {}
         
+        # 去重后并发请求，相同地址共用一次请求
+        semaphore = asyncio.Semaphore(_GEOCODE_CONCURRENCY)
+        unique_locations = list(dict.fromkeys(locations))
+        results = await asyncio.gather(
+            *(_geocode_one(context, maps_service, location, semaphore) for location in unique_locations),
+            return_exceptions=True
+        )
+        outcomes = dict(zip(unique_locations, results))
+        
+        # 本批记录共用一个时间戳
+        ts = datetime.now().isoformat()
         for location in locations:
-            try:
-                # Check cache first
-                if location in context.geocode_cache:
-                    result = context.geocode_cache[location]
-                else:
-                    result = maps_service.geocode(location)
-                    context.geocode_cache[location] = result
-                
+            result = outcomes[location]
+            if isinstance(result, BaseException):
+                state.add_geocode_operation(location, {}, "failed", timestamp=ts)
+                state.add_error("geocode", f"Failed to geocode {location}: {str(result)}", timestamp=ts)
+            else:
                 geocoded_locations[location] = result
-                state.add_geocode_operation(location, result, "success")
+                state.add_geocode_operation(location, result, "success", timestamp=ts)
                 state.progress["geocoded_count"] += 1
-                
-            except Exception as e:
-                state.add_geocode_operation(location, {}, "failed")
-                state.add_error("geocode", f"Failed to geocode {location}: {str(e)}")
         
         planning_log_entry = {
             "type": "geocode_locations",
             "locations_count": len(locations),
             "success_count": state.progress["geocoded_count"],
             "status": "success",
-            "results": geocoded_locations
+            "result_keys": list(geocoded_locations)
         }
         
-        context.add_planning_log_entry(planning_log_entry)
+        context.add_planning_log_entry(planning_log_entry, timestamp=ts)
         
         return {
             "status": "success",
@@ -155,15 +433,28 @@ async def calculate_distances_node(
         state.update_status("running", "calculating_distances")
         state.progress["stage"] = "calculating_distances"
         
-        # Calculate distance matrix with traffic
-        distance_matrix = maps_service.get_distance_matrix(
-            origins=origins,
-            destinations=destinations,
-            mode="driving",
-            departure_time=departure_time,
-            traffic_model=traffic_model
+        # Calculate distance matrix with traffic（超过单次请求上限时分块并发请求）
+        semaphore = asyncio.Semaphore(_DM_CONCURRENCY)
+        tile_results = await asyncio.gather(
+            *(
+                _fetch_distance_tile(maps_service, semaphore, tile_origins, tile_destinations, departure_time, traffic_model)
+                for tile_origins, tile_destinations in _tile(origins, destinations)
+            ),
+            return_exceptions=True
         )
         
+        # 任一分块失败则整个节点失败：缺失的点对会被优化器当作不可达，
+        # 得到看似正常实则退化的路线（等所有分块结束后再报错，不留下未完成的请求）
+        failures = [r for r in tile_results if isinstance(r, BaseException)]
+        if failures:
+            raise ValueError(
+                f"{len(failures)} of {len(tile_results)} distance matrix tiles failed: {failures[0]}"
+            ) from failures[0]
+        
+        # 本批记录共用一个时间戳
+        ts = datetime.now().isoformat()
+        distance_matrix = [entry for result in tile_results for entry in result]
+        
         # Log distance matrix operation
         for entry in distance_matrix:
             if "distance_meters" in entry:
@@ -171,7 +462,8 @@ async def calculate_distances_node(
                     entry["origin"],
                     entry["destination"],
                     entry,
-                    "success"
+                    "success",
+                    timestamp=ts
                 )
         
         planning_log_entry = {
@@ -184,7 +476,7 @@ async def calculate_distances_node(
             "status": "success"
         }
         
-        context.add_planning_log_entry(planning_log_entry)
+        context.add_planning_log_entry(planning_log_entry, timestamp=ts)
         
         return {
             "status": "success",
@@ -204,7 +496,8 @@ async def search_business_places_node(
     location: str,
     place_type: str = "restaurant",
     radius: int = 1000,
-    keyword: Optional[str] = None
+    keyword: Optional[str] = None,
+    update_stage: bool = True
 ) -> Dict[str, Any]:
     """
     Search business places node (restaurants/hotels)
@@ -217,34 +510,49 @@ async def search_business_places_node(
         place_type: Place type (restaurant, lodging)
         radius: Search radius in meters
         keyword: Search keyword (e.g., 'business lunch')
+        update_stage: Whether to set the state status/stage (False when the
+            caller runs several nodes concurrently and sets them itself)
         
     Returns:
         Updated state with place search results
     """
     try:
-        state.update_status("running", "searching_places")
-        state.progress["stage"] = "searching_places"
-        
-        # Search places
-        if place_type == "restaurant":
-            results = maps_service.search_business_restaurants(
-                location=location,
-                radius=radius,
-                keyword=keyword or "business lunch"
-            )
-        elif place_type == "lodging":
-            results = maps_service.search_business_hotels(
-                location=location,
-                radius=radius
-            )
-        else:
-            results = maps_service.search_places(
-                query=f"{place_type} {location}",
-                location=location,
-                radius=radius,
-                place_type=place_type,
-                keyword=keyword
-            )
+        if update_stage:
+            state.update_status("running", "searching_places")
+            state.progress["stage"] = "searching_places"
+        
+        # Search places (process-wide cache first, then the on-disk cache)
+        shared_key = (place_type, _normalize_address(location), radius, keyword)
+        results = _PLACES_CACHE.get(shared_key)
+        if results is None:
+            results = await _PLACES_STORE.aget(shared_key)
+        if results is None:
+            if place_type == "restaurant":
+                results = await _maps_call(
+                    maps_service.search_business_restaurants,
+                    location=location,
+                    radius=radius,
+                    keyword=keyword or "business lunch"
+                )
+            elif place_type == "lodging":
+                results = await _maps_call(
+                    maps_service.search_business_hotels,
+                    location=location,
+                    radius=radius
+                )
+            else:
+                results = await _maps_call(
+                    maps_service.search_places,
+                    query=f"{place_type} {location}",
+                    location=location,
+                    radius=radius,
+                    place_type=place_type,
+                    keyword=keyword
+                )
+            # 只有新请求的结果写入缓存：重复写入会重置 TTLCache 的过期时间；
+            # 磁盘命中也不放入内存缓存，否则在磁盘上的存活时间之外又多一整个 TTL
+            _PLACES_CACHE[shared_key] = results
+            await _PLACES_STORE.aset(shared_key, results)
         
         # Cache results
         cache_key = f"{place_type}_{location}_{radius}"
@@ -261,6 +569,7 @@ async def search_business_places_node(
             "type": "search_business_places",
             "location": location,
             "place_type": place_type,
+            "cache_key": cache_key,
             "results_count": len(results),
             "status": "success"
         }
@@ -308,46 +617,36 @@ async def optimize_route_node(
         state.update_status("running", "optimizing_route")
         state.progress["stage"] = "optimizing_route"
         
-        # Optimize route order
-        optimized_order = route_optimizer.optimize_route_order(
-            locations=locations,
-            start_location=start_location,
-            end_location=end_location,
-            distance_matrix=distance_matrix
-        )
-        
-        # Calculate schedule
-        route_segments = []
-        for i in range(len(optimized_order) - 1):
-            from_loc = optimized_order[i]
-            to_loc = optimized_order[i + 1]
-            
-            # Find distance matrix entry
-            segment_data = next(
-                (entry for entry in distance_matrix 
-                 if entry.get("origin") == from_loc and entry.get("destination") == to_loc),
-                {}
+        # 相同地点与距离数据直接复用上次的路线（约束只影响时间表）
+        route_key = _route_cache_key(locations, start_location, end_location, distance_matrix)
+        cached_route = _ROUTE_CACHE.get(route_key)
+        if cached_route is None:
+            # Optimize route order（优化器自行选择稠密/稀疏矩阵，并缓存相同输入的结果）
+            optimized_order = await asyncio.to_thread(
+                route_optimizer.optimize_route_order,
+                locations,
+                start_location,
+                end_location,
+                distance_matrix
             )
-            
-            if segment_data:
-                route_segments.append({
-                    "from_location": from_loc,
-                    "to_location": to_loc,
-                    "distance_meters": segment_data.get("distance_meters", 0),
-                    "distance_text": segment_data.get("distance_text", ""),
-                    "duration_seconds": segment_data.get("duration_seconds", 0),
-                    "duration_text": segment_data.get("duration_text", ""),
-                    "duration_in_traffic_seconds": segment_data.get("duration_in_traffic_seconds"),
-                    "duration_in_traffic_text": segment_data.get("duration_in_traffic_text", ""),
-                    "traffic_delay_minutes": segment_data.get("traffic_delay_minutes", 0)
-                })
+            route_segments = _build_route_segments(optimized_order, distance_matrix)
+            _ROUTE_CACHE[route_key] = (tuple(optimized_order), route_segments)
+        else:
+            optimized_order, route_segments = cached_route
+        optimized_order = list(optimized_order)
         
         # Calculate schedule with traffic awareness
-        scheduled_segments = route_optimizer.calculate_schedule(
-            route_segments=route_segments,
-            start_time=constraints.get("start_time", "08:00"),
-            constraints=constraints
-        )
+        schedule_key = (route_key, json.dumps(constraints, sort_keys=True, default=str))
+        cached_schedule = _SCHEDULE_CACHE.get(schedule_key)
+        if cached_schedule is None:
+            cached_schedule = await asyncio.to_thread(
+                route_optimizer.calculate_schedule,
+                route_segments=route_segments,
+                start_time=constraints.get("start_time", "08:00"),
+                constraints=constraints
+            )
+            _SCHEDULE_CACHE[schedule_key] = cached_schedule
+        scheduled_segments = [dict(segment) for segment in cached_schedule]
         
         planning_log_entry = {
             "type": "optimize_route",
@@ -391,41 +690,28 @@ async def assess_traffic_risks_node(
         state.update_status("running", "assessing_risks")
         state.progress["stage"] = "assessing_risks"
         
-        # Group risks by level
-        high_risks = []
-        medium_risks = []
-        low_risks = []
-        
-        for i, segment in enumerate(route_segments):
-            risk_level = segment.get("risk_level", "low")
-            risk_data = {
-                "segment_index": i,
-                "from": segment.get("from_location"),
-                "to": segment.get("to_location"),
-                "time": segment.get("departure_time"),
-                "level": risk_level,
-                "cause": segment.get("risk_cause"),
-                "mitigation": segment.get("risk_mitigation"),
-                "duration_in_traffic": segment.get("duration_in_traffic_text")
-            }
-            
-            if risk_level == "high":
-                high_risks.append(risk_data)
-            elif risk_level == "medium":
-                medium_risks.append(risk_data)
-            else:
-                low_risks.append(risk_data)
+        # Group risks by level（按列一次性分类，未知等级归入 low）
+        segments = RouteSegments.from_records(route_segments)
+        mask_high = segments.risk_level == "high"
+        mask_medium = segments.risk_level == "medium"
+        mask_low = ~(mask_high | mask_medium)
+        buckets = {
+            level: [segments.risk_record(int(i)) for i in np.flatnonzero(mask)]
+            for level, mask in (("high", mask_high), ("medium", mask_medium), ("low", mask_low))
+        }
         
-        traffic_risk_context = ContextExtractor.prepare_traffic_risk_context(
-            route_segments=route_segments,
-            planning_context=context
-        )
+        # 风险统计直接由掩码得出，不再逐段重新遍历 route_segments
+        high_count = int(mask_high.sum())
+        medium_count = int(mask_medium.sum())
+        risk_summary = {
+            "high_risk_count": high_count,
+            "medium_risk_count": medium_count,
+            "low_risk_count": len(segments) - high_count - medium_count
+        }
         
         planning_log_entry = {
             "type": "assess_traffic_risks",
-            "high_risk_count": len(high_risks),
-            "medium_risk_count": len(medium_risks),
-            "low_risk_count": len(low_risks),
+            **risk_summary,
             "status": "success"
         }
         
@@ -433,12 +719,8 @@ async def assess_traffic_risks_node(
         
         return {
             "status": "success",
-            "traffic_risks": {
-                "high": high_risks,
-                "medium": medium_risks,
-                "low": low_risks
-            },
-            "risk_summary": traffic_risk_context["risk_summary"],
+            "traffic_risks": buckets,
+            "risk_summary": risk_summary,
             "state": state.to_dict()
         }
         
@@ -453,7 +735,8 @@ async def generate_alternatives_node(
     maps_service: MapsService,
     origin: str,
     destination: str,
-    departure_time: Optional[datetime] = None
+    departure_time: Optional[datetime] = None,
+    update_stage: bool = True
 ) -> Dict[str, Any]:
     """
     Generate alternative routes node
@@ -465,35 +748,51 @@ async def generate_alternatives_node(
         origin: Origin address
         destination: Destination address
         departure_time: Optional departure time
+        update_stage: Whether to set the state status/stage (False when the
+            caller runs several nodes concurrently and sets them itself)
         
     Returns:
         Updated state with alternative routes
     """
     try:
-        state.update_status("running", "generating_alternatives")
-        state.progress["stage"] = "generating_alternatives"
-        
-        # Get directions with alternatives
-        directions_result = maps_service.get_directions(
-            origin=origin,
-            destination=destination,
-            mode="driving",
-            departure_time=departure_time,
-            traffic_model="pessimistic",
-            alternatives=True
-        )
-        
-        alternatives = []
-        if "routes" in directions_result:
-            for i, route in enumerate(directions_result["routes"]):
-                alternatives.append({
-                    "route_number": i + 1,
-                    "distance": route.get("distance_text"),
-                    "duration": route.get("duration_text"),
-                    "duration_in_traffic": route.get("duration_in_traffic_text"),
-                    "summary": route.get("summary", ""),
-                    "is_primary": i == 0
-                })
+        if update_stage:
+            state.update_status("running", "generating_alternatives")
+            state.progress["stage"] = "generating_alternatives"
+        
+        # 起终点相同无需请求；相同起终点与 5 分钟出发时段复用上次结果
+        origin_key = _normalize_address(origin)
+        destination_key = _normalize_address(destination)
+        time_bucket = int(departure_time.timestamp()) // 300 if departure_time else None
+        cache_key = (origin_key, destination_key, "pessimistic", time_bucket)
+        
+        if origin_key == destination_key:
+            alternatives = []
+        elif cache_key in _ALTERNATIVES_CACHE:
+            alternatives = [dict(alternative) for alternative in _ALTERNATIVES_CACHE[cache_key]]
+        else:
+            # Get directions with alternatives
+            directions_result = await _maps_call(
+                maps_service.get_directions,
+                origin=origin,
+                destination=destination,
+                mode="driving",
+                departure_time=departure_time,
+                traffic_model="pessimistic",
+                alternatives=True
+            )
+            
+            alternatives = []
+            if "routes" in directions_result:
+                for i, route in enumerate(directions_result["routes"]):
+                    alternatives.append({
+                        "route_number": i + 1,
+                        "distance": route.get("distance_text"),
+                        "duration": route.get("duration_text"),
+                        "duration_in_traffic": route.get("duration_in_traffic_text"),
+                        "summary": route.get("summary", ""),
+                        "is_primary": i == 0
+                    })
+            _ALTERNATIVES_CACHE[cache_key] = tuple(dict(alternative) for alternative in alternatives)
         
         planning_log_entry = {
             "type": "generate_alternatives",
@@ -517,6 +816,89 @@ async def generate_alternatives_node(
         return {"status": "error", "error": str(e), "state": state.to_dict()}
 
 
+async def plan_parallel(
+    state: PlanningState,
+    context: PlanningContext,
+    maps_service: MapsService,
+    place_locations: List[str],
+    od_pairs: List[Tuple[str, str]],
+    place_type: str = "restaurant",
+    radius: int = 1000,
+    keyword: Optional[str] = None,
+    departure_time: Optional[datetime] = None
+) -> Dict[str, Any]:
+    """
+    Run place searches and alternative-route lookups concurrently
+    
+    Once geocoding is done these stages share no data, so every place
+    search and every origin/destination alternatives lookup is started at
+    once, with a separate concurrency cap per upstream API. The sub-nodes
+    share one PlanningState, so the stage is set here once rather than by
+    each node as it starts.
+    
+    Args:
+        state: Planning state
+        context: Planning context
+        maps_service: Maps service instance
+        place_locations: Locations to search for business places around
+        od_pairs: (origin, destination) pairs to fetch alternatives for
+        place_type: Place type (restaurant, lodging)
+        radius: Search radius in meters
+        keyword: Search keyword (e.g., 'business lunch')
+        departure_time: Optional departure time for alternatives
+        
+    Returns:
+        Node results per place location and per O-D pair, in input order;
+        status is "success" when every sub-node succeeded, "partial" when
+        some failed and "error" when all of them failed
+    """
+    state.update_status("running", _PARALLEL_STAGE)
+    state.progress["stage"] = _PARALLEL_STAGE
+    
+    places_semaphore = asyncio.Semaphore(_PARALLEL_CONCURRENCY)
+    directions_semaphore = asyncio.Semaphore(_PARALLEL_CONCURRENCY)
+    
+    async def _search(location: str) -> Dict[str, Any]:
+        async with places_semaphore:
+            return await search_business_places_node(
+                state, context, maps_service, location,
+                place_type=place_type, radius=radius, keyword=keyword,
+                update_stage=False
+            )
+    
+    async def _alternatives(origin: str, destination: str) -> Dict[str, Any]:
+        async with directions_semaphore:
+            return await generate_alternatives_node(
+                state, context, maps_service, origin, destination,
+                departure_time=departure_time,
+                update_stage=False
+            )
+    
+    places_results, alternatives_results = await asyncio.gather(
+        asyncio.gather(*(_search(location) for location in place_locations)),
+        asyncio.gather(*(_alternatives(origin, destination) for origin, destination in od_pairs))
+    )
+    
+    # 汇总子节点结果（各子节点失败时已写入 state.errors）
+    results = [*places_results, *alternatives_results]
+    failed = sum(1 for result in results if result.get("status") != "success")
+    if not failed:
+        status = "success"
+    elif failed < len(results):
+        status = "partial"
+    else:
+        status = "error"
+        state.update_status("failed", _PARALLEL_STAGE)
+    
+    return {
+        "status": status,
+        "failed_count": failed,
+        "places_results": list(places_results),
+        "alternatives_results": list(alternatives_results),
+        "state": state.to_dict()
+    }
+
+
 async def generate_report_node(
     state: PlanningState,
     context: PlanningContext,
@@ -540,7 +922,8 @@ async def generate_report_node(
         state.progress["stage"] = "generating_report"
         
         # Generate markdown report
-        report = report_generator.generate_markdown(
+        report = await asyncio.to_thread(
+            report_generator.generate_markdown,
             plan_data=plan_data,
             include_details=True
         )
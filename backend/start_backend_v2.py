@@ -27,13 +27,10 @@ try:
 except ImportError:
     print("⚠️  python-dotenv 未安装，将使用系统环境变量")
 
-# 验证环境变量
-required_env_vars = ["GOOGLE_MAPS_API_KEY", "ANTHROPIC_API_KEY"]
-missing_vars = []
+# 验证环境变量（.env 加载后再读取，启动后各服务直接使用 settings）
+from app.config import settings
 
-for var in required_env_vars:
-    if not os.getenv(var):
-        missing_vars.append(var)
+missing_vars = settings.missing()
 
 if missing_vars:
     print(f"❌ 缺少必需的环境变量: {', '.join(missing_vars)}")
@@ -47,16 +44,40 @@ print("✅ 环境变量检查通过")
 if __name__ == '__main__':
     import uvicorn
     
+    # DEV=1：单进程 + 自动重载（开发）；否则不启用 reload，WORKERS 指定 worker 数（reload 与多 worker 互斥）
+    # 注意：对话保存在进程内存中，多 worker 时同一对话的请求可能落到不同进程
+    dev = os.getenv("DEV", "0") == "1"
+    workers = 1 if dev else int(os.getenv("WORKERS", "1"))
+    
+    # uvloop / httptools 可用时使用（Windows 不支持 uvloop，回退到标准 asyncio）
+    try:
+        import uvloop  # noqa: F401
+        loop = "uvloop"
+    except ImportError:
+        loop = "asyncio"
+    try:
+        import httptools  # noqa: F401
+        http = "httptools"
+    except ImportError:
+        http = "h11"
+    
     print("🚀 启动 Travel Planner Service V2...")
     print("📍 后端地址: http://localhost:8000")
     print("📖 API 文档: http://localhost:8000/docs")
-    print("🔄 自动重载: 已启用")
+    if dev:
+        print("🔄 自动重载: 已启用 (DEV=1)")
+    else:
+        print(f"👷 Worker 进程数: {workers}（设置 DEV=1 启用自动重载，WORKERS=N 启动多个进程）")
+    print(f"⚡ 事件循环: {loop}, HTTP: {http}")
     print("-" * 50)
     
     uvicorn.run(
         "app.main_v2:app",
         host="0.0.0.0",
         port=8000,
-        reload=True,
-        log_level="info"
+        reload=dev,
+        workers=workers,
+        log_level="info",
+        loop=loop,
+        http=http
     )
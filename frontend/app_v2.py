@@ -2,11 +2,26 @@
 
 import streamlit as st
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util import Retry
 import json
+import re
 import time
 from typing import Dict, Any, List, Optional
 from datetime import datetime
 
+try:
+    import orjson
+    _json_loads = orjson.loads
+    _json_dumps = orjson.dumps
+except ImportError:
+    _json_loads = json.loads
+    
+    def _json_dumps(obj: Any) -> bytes:
+        return json.dumps(obj, ensure_ascii=False).encode("utf-8")
+
+_JSON_HEADERS = {"Content-Type": "application/json"}
+
 # 页面配置
 st.set_page_config(
     page_title="智能旅行规划助手",
@@ -22,8 +37,39 @@ API_BASE_URL = st.sidebar.text_input(
     help="后端 FastAPI 服务的地址"
 )
 
+# 规划阶段 -> 显示名称
+_STAGE_NAMES = {
+    "understanding": "🤔 理解需求",
+    "initial_planning": "📋 初始规划",
+    "interactive_optimization": "🔄 交互优化",
+    "final_confirmation": "✅ 最终确认",
+    "execution": "🚀 执行中"
+}
+
+# 已格式化时间戳缓存的最大条数
+_TIMESTAMP_CACHE_SIZE = 4096
+
+# 消息角色 -> (CSS 类名, 显示名称)，其他角色按系统消息显示
+_MESSAGE_STYLES = {
+    "user": ("user-message", "您"),
+    "assistant": ("assistant-message", "助手")
+}
+
+# 对话历史默认只渲染最近的消息条数
+_HISTORY_WINDOW = 20
+
+# 示例需求：(按钮 key, 按钮文字, 示例文本)，key 固定为序号，不再对文本调用 hash()
+_EXAMPLES = [
+    (f"example_{i}", f"💡 {example}", example)
+    for i, example in enumerate([
+        "我想和朋友3个人去雅加达玩3天，喜欢文化景点和美食",
+        "计划家庭旅行，4个人去巴厘岛5天，有老人和小孩",
+        "商务出差顺便旅游，2天时间在新加坡，预算有限"
+    ])
+]
+
 # 自定义 CSS
-st.markdown("""
+_CSS = """
 <style>
     .chat-container {
         max-height: 600px;
@@ -90,13 +136,42 @@ st.markdown("""
         cursor: pointer;
     }
 </style>
-""", unsafe_allow_html=True)
+"""
+
+
+@st.cache_resource
+def _css() -> str:
+    """压缩后的样式表（每个进程只处理一次；每次重跑仍需输出，否则样式会被 Streamlit 移除）"""
+    return re.sub(r"\s*([{};:,])\s*", r"\1", re.sub(r"\s+", " ", _CSS)).strip()
+
+
+st.markdown(_css(), unsafe_allow_html=True)
+
+
+def get_http_session() -> requests.Session:
+    """获取复用连接池的 HTTP 会话（保存在 session_state 中，Streamlit 重跑时复用）"""
+    if "http_session" not in st.session_state:
+        session = requests.Session()
+        # 连接失败对所有请求重试（请求未发出）；502/503/504 只对 GET 重试，避免重复提交对话
+        retry = Retry(
+            total=3,
+            backoff_factor=0.3,
+            status_forcelist=[502, 503, 504],
+            allowed_methods=["GET"],
+            raise_on_status=False
+        )
+        adapter = HTTPAdapter(pool_connections=10, pool_maxsize=20, max_retries=retry)
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        st.session_state.http_session = session
+    return st.session_state.http_session
 
 
-def check_api_health() -> bool:
-    """检查 API 健康状态"""
+@st.cache_data(ttl=10, show_spinner=False)
+def check_api_health(api_base_url: str) -> bool:
+    """检查 API 健康状态（结果缓存 10 秒，避免每次重跑都探测）"""
     try:
-        response = requests.get(f"{API_BASE_URL}/api/health", timeout=5)
+        response = get_http_session().get(f"{api_base_url}/api/health", timeout=5)
         return response.status_code == 200
     except:
         return False
@@ -105,13 +180,14 @@ def check_api_health() -> bool:
 def start_conversation(user_input: str) -> Optional[Dict[str, Any]]:
     """开始新对话"""
     try:
-        response = requests.post(
+        response = get_http_session().post(
             f"{API_BASE_URL}/api/v2/conversation/start",
-            json={"user_input": user_input},
+            data=_json_dumps({"user_input": user_input}),
+            headers=_JSON_HEADERS,
             timeout=30
         )
         response.raise_for_status()
-        return response.json()
+        return _json_loads(response.content)
     except Exception as e:
         st.error(f"启动对话失败: {str(e)}")
         return None
@@ -120,16 +196,17 @@ def start_conversation(user_input: str) -> Optional[Dict[str, Any]]:
 def continue_conversation(conversation_id: str, user_input: str) -> Optional[Dict[str, Any]]:
     """继续对话"""
     try:
-        response = requests.post(
+        response = get_http_session().post(
             f"{API_BASE_URL}/api/v2/conversation/continue",
-            json={
+            data=_json_dumps({
                 "conversation_id": conversation_id,
                 "user_input": user_input
-            },
+            }),
+            headers=_JSON_HEADERS,
             timeout=30
         )
         response.raise_for_status()
-        return response.json()
+        return _json_loads(response.content)
     except Exception as e:
         st.error(f"继续对话失败: {str(e)}")
         return None
@@ -138,12 +215,12 @@ def continue_conversation(conversation_id: str, user_input: str) -> Optional[Dic
 def get_conversation_details(conversation_id: str) -> Optional[Dict[str, Any]]:
     """获取对话详情"""
     try:
-        response = requests.get(
+        response = get_http_session().get(
             f"{API_BASE_URL}/api/v2/conversation/{conversation_id}",
             timeout=10
         )
         response.raise_for_status()
-        return response.json()
+        return _json_loads(response.content)
     except Exception as e:
         st.error(f"获取对话详情失败: {str(e)}")
         return None
@@ -151,64 +228,67 @@ def get_conversation_details(conversation_id: str) -> Optional[Dict[str, Any]]:
 
 def render_stage_indicator(stage: str):
     """渲染阶段指示器"""
-    stage_names = {
-        "understanding": "🤔 理解需求",
-        "initial_planning": "📋 初始规划",
-        "interactive_optimization": "🔄 交互优化",
-        "final_confirmation": "✅ 最终确认",
-        "execution": "🚀 执行中"
-    }
-    
-    stage_name = stage_names.get(stage, stage)
+    stage_name = _STAGE_NAMES.get(stage, stage)
     st.markdown(f'<div class="stage-indicator">{stage_name}</div>', unsafe_allow_html=True)
 
 
-def render_message(role: str, content: str, timestamp: Optional[str] = None):
-    """渲染消息"""
-    time_str = ""
-    if timestamp:
+@st.cache_resource
+def _timestamp_labels() -> Dict[str, str]:
+    """时间戳 -> 显示标签的缓存（cache_resource 跨重跑保留；脚本内的 lru_cache 每次重跑都会重建）"""
+    return {}
+
+
+def _fmt_ts(timestamp: str) -> str:
+    """将 ISO 时间戳格式化为 " (HH:MM)"，无法解析时返回空字符串"""
+    labels = _timestamp_labels()
+    label = labels.get(timestamp)
+    if label is None:
         try:
             dt = datetime.fromisoformat(timestamp.replace('Z', '+00:00'))
-            time_str = f" ({dt.strftime('%H:%M')})"
-        except:
-            pass
-    
-    if role == "user":
-        st.markdown(f'''
-        <div class="user-message">
-            <strong>您{time_str}:</strong><br>
-            {content}
-        </div>
-        ''', unsafe_allow_html=True)
-    elif role == "assistant":
-        st.markdown(f'''
-        <div class="assistant-message">
-            <strong>助手{time_str}:</strong><br>
-            {content}
-        </div>
-        ''', unsafe_allow_html=True)
-    else:
-        st.markdown(f'''
-        <div class="system-message">
-            <strong>系统{time_str}:</strong><br>
-            {content}
-        </div>
-        ''', unsafe_allow_html=True)
+            label = f" ({dt.strftime('%H:%M')})"
+        except Exception:
+            label = ""
+        if len(labels) >= _TIMESTAMP_CACHE_SIZE:
+            labels.clear()
+        labels[timestamp] = label
+    return label
 
 
-def get_conversation_report(conversation_id: str) -> Optional[str]:
-    """获取对话的详细报告（Markdown格式）"""
-    try:
-        response = requests.get(
-            f"{API_BASE_URL}/api/v2/conversation/{conversation_id}/report",
-            timeout=10
-        )
+def _format_msg_html(role: str, content: str, timestamp: Optional[str] = None) -> str:
+    """生成单条消息的 HTML（不调用 Streamlit）"""
+    time_str = _fmt_ts(timestamp) if timestamp else ""
+    css_class, speaker = _MESSAGE_STYLES.get(role, ("system-message", "系统"))
+    return (
+        f'<div class="{css_class}">\n'
+        f'<strong>{speaker}{time_str}:</strong><br>\n'
+        f'{content}\n'
+        '</div>'
+    )
+
+
+def render_messages(messages: List[Dict[str, Any]]):
+    """渲染消息列表（拼接为一段 HTML，只输出一个 st.markdown 元素；跳过非文本消息）"""
+    parts = [
+        _format_msg_html(msg.get("role", "unknown"), msg.get("content", ""), msg.get("timestamp"))
+        for msg in messages
+        if msg.get("type") == "text"
+    ]
+    if parts:
+        st.markdown("\n".join(parts), unsafe_allow_html=True)
+
+
+def stream_conversation_report(conversation_id: str):
+    """逐块获取对话的详细报告（Markdown格式）；请求或传输中断时抛出异常，由调用方处理"""
+    with get_http_session().get(
+        f"{API_BASE_URL}/api/v2/conversation/{conversation_id}/report/stream",
+        timeout=10,
+        stream=True
+    ) as response:
         response.raise_for_status()
-        data = response.json()
-        return data.get("report", "")
-    except Exception as e:
-        st.error(f"获取报告失败: {str(e)}")
-        return None
+        response.encoding = response.encoding or "utf-8"
+        for chunk in response.iter_content(chunk_size=None, decode_unicode=True):
+            if chunk:
+                yield chunk
 
 
 def render_travel_plan(plan: Dict[str, Any], conversation_id: Optional[str] = None):
@@ -218,16 +298,35 @@ def render_travel_plan(plan: Dict[str, Any], conversation_id: Optional[str] = No
     
     st.markdown('<div class="plan-card">', unsafe_allow_html=True)
     
-    # 尝试获取详细报告
+    # 报告只随计划版本变化：同一版本直接使用本会话缓存的报告
+    plan_key = (plan.get("id"), plan.get("version"))
+    report_cache = st.session_state.setdefault("report_cache", {})
+    cached = report_cache.get(conversation_id) if conversation_id else None
     report_markdown = None
-    if conversation_id:
-        with st.spinner("正在生成详细报告..."):
-            report_markdown = get_conversation_report(conversation_id)
-    
-    if report_markdown:
+    if cached and cached[0] == plan_key:
         # 显示完整的 Markdown 报告（与参考文档一致）
+        report_markdown = cached[1]
         st.markdown(report_markdown)
-    else:
+    elif conversation_id:
+        # 流式请求报告，边接收边渲染
+        placeholder = st.empty()
+        placeholder.caption("正在生成详细报告...")
+        accumulated = []
+        try:
+            for chunk in stream_conversation_report(conversation_id):
+                accumulated.append(chunk)
+                placeholder.markdown("".join(accumulated))
+            report_markdown = "".join(accumulated)
+        except Exception as e:
+            # 中途断开时丢弃不完整的报告，不写入缓存
+            st.error(f"获取报告失败: {str(e)}")
+            report_markdown = ""
+        if report_markdown:
+            report_cache[conversation_id] = (plan_key, report_markdown)
+        else:
+            placeholder.empty()
+    
+    if not report_markdown:
         # 降级显示：显示基本信息（向后兼容）
         st.markdown(f"### 📋 {plan.get('title', '旅行计划')}")
         
@@ -278,15 +377,23 @@ def render_suggested_actions(actions: List[str], conversation_id: str):
     if not actions:
         return
     
-    st.markdown("#### 💡 建议操作")
-    cols = st.columns(min(len(actions), 3))
-    
-    for i, action in enumerate(actions):
-        with cols[i % 3]:
-            if st.button(action, key=f"action_{i}_{conversation_id}"):
-                # 将建议操作作为用户输入
-                st.session_state.user_input = action
-                st.rerun()
+    # 单个 radio 代替多列按钮；选中后在回调中写入输入框并清空选择，避免重跑时重复触发
+    key = f"actions_{conversation_id}"
+    st.radio(
+        "💡 建议操作",
+        options=actions,
+        index=None,
+        horizontal=True,
+        key=key,
+        on_change=_use_suggested_action,
+        args=(key,)
+    )
+
+
+def _use_suggested_action(key: str):
+    """将选中的建议操作作为用户输入"""
+    st.session_state.user_input = st.session_state[key]
+    st.session_state[key] = None
 
 
 def main():
@@ -295,10 +402,11 @@ def main():
     st.markdown("---")
     
     # 检查 API 连接
-    if not check_api_health():
+    if not check_api_health(API_BASE_URL):
         st.error("⚠️ 无法连接到后端服务，请确保后端正在运行")
         st.info(f"后端地址: {API_BASE_URL}")
         if st.button("重试连接"):
+            check_api_health.clear()
             st.rerun()
         return
     
@@ -329,7 +437,16 @@ def main():
             if st.button("🔄 刷新对话"):
                 conversation_details = get_conversation_details(st.session_state.conversation_id)
                 if conversation_details:
-                    st.session_state.conversation_data = conversation_details
+                    # 保留上次响应中的建议操作等字段，只更新对话内容
+                    st.session_state.conversation_data = {
+                        **(st.session_state.conversation_data or {}),
+                        "stage": conversation_details.get("stage"),
+                        "messages": [
+                            msg for msg in conversation_details.get("messages", [])
+                            if msg.get("type") == "text"
+                        ],
+                        "current_plan": conversation_details.get("current_plan")
+                    }
                 st.rerun()
     
     # 主界面
@@ -338,14 +455,8 @@ def main():
         st.markdown("### 🚀 开始您的旅行规划")
         st.markdown("请用自然语言描述您的旅行计划，例如：")
         
-        examples = [
-            "我想和朋友3个人去雅加达玩3天，喜欢文化景点和美食",
-            "计划家庭旅行，4个人去巴厘岛5天，有老人和小孩",
-            "商务出差顺便旅游，2天时间在新加坡，预算有限"
-        ]
-        
-        for example in examples:
-            if st.button(f"💡 {example}", key=f"example_{hash(example)}"):
+        for key, label, example in _EXAMPLES:
+            if st.button(label, key=key):
                 st.session_state.user_input = example
         
         st.markdown("---")
@@ -375,82 +486,79 @@ def main():
             # 显示当前阶段
             render_stage_indicator(conversation_data.get("stage", "unknown"))
             
-            # 获取完整对话历史
-            conversation_details = get_conversation_details(st.session_state.conversation_id)
+            # 显示对话历史（消息与当前计划已包含在 start/continue 的响应中，无需再请求对话详情）
+            st.markdown("### 💬 对话历史")
             
-            if conversation_details:
-                # 显示对话历史
-                st.markdown("### 💬 对话历史")
-                
-                messages = conversation_details.get("messages", [])
-                text_messages = [msg for msg in messages if msg.get("type") == "text"]
-                
-                # 创建聊天容器
-                chat_container = st.container()
-                
-                with chat_container:
-                    for msg in text_messages:
-                        render_message(
-                            msg.get("role", "unknown"),
-                            msg.get("content", ""),
-                            msg.get("timestamp")
-                        )
-                
-                # 显示当前计划（使用详细报告）
-                current_plan = conversation_details.get("current_plan")
-                if current_plan:
-                    st.markdown("---")
-                    render_travel_plan(current_plan, conversation_id=st.session_state.conversation_id)
-                
-                # 建议操作
-                suggested_actions = conversation_data.get("suggested_actions", [])
-                if suggested_actions:
-                    st.markdown("---")
-                    render_suggested_actions(suggested_actions, st.session_state.conversation_id)
-                
-                # 用户输入区域
+            messages = conversation_data.get("messages", [])
+            
+            # 创建聊天容器
+            chat_container = st.container()
+            
+            with chat_container:
+                # 只渲染最近的消息；更早的消息在打开开关后才渲染
+                older = messages[:-_HISTORY_WINDOW]
+                if older and st.toggle(
+                    f"显示更早的 {len(older)} 条消息",
+                    key=f"show_older_{st.session_state.conversation_id}"
+                ):
+                    render_messages(older)
+                render_messages(messages[-_HISTORY_WINDOW:])
+            
+            # 显示当前计划（使用详细报告）
+            current_plan = conversation_data.get("current_plan")
+            if current_plan:
                 st.markdown("---")
-                st.markdown("### ✍️ 继续对话")
-                
-                # 检查是否需要确认
-                requires_confirmation = conversation_data.get("requires_confirmation", False)
-                if requires_confirmation:
-                    st.info("🎯 计划已准备就绪，请确认是否执行或提出修改建议")
-                
-                user_input = st.text_area(
-                    "您的回复：",
-                    value=st.session_state.user_input,
-                    height=80,
-                    placeholder="请输入您的问题、建议或确认..."
-                )
-                
-                col1, col2 = st.columns([3, 1])
-                
-                with col1:
-                    if st.button("💬 发送", type="primary", disabled=not user_input.strip()):
-                        with st.spinner("正在处理您的回复..."):
-                            result = continue_conversation(st.session_state.conversation_id, user_input)
-                            if result:
-                                st.session_state.conversation_data = result
-                                st.session_state.user_input = ""
+                render_travel_plan(current_plan, conversation_id=st.session_state.conversation_id)
+            
+            # 建议操作
+            suggested_actions = conversation_data.get("suggested_actions", [])
+            if suggested_actions:
+                st.markdown("---")
+                render_suggested_actions(suggested_actions, st.session_state.conversation_id)
+            
+            # 用户输入区域
+            st.markdown("---")
+            st.markdown("### ✍️ 继续对话")
+            
+            # 检查是否需要确认
+            requires_confirmation = conversation_data.get("requires_confirmation", False)
+            if requires_confirmation:
+                st.info("🎯 计划已准备就绪，请确认是否执行或提出修改建议")
+            
+            user_input = st.text_area(
+                "您的回复：",
+                value=st.session_state.user_input,
+                height=80,
+                placeholder="请输入您的问题、建议或确认..."
+            )
+            
+            col1, col2 = st.columns([3, 1])
+            
+            with col1:
+                if st.button("💬 发送", type="primary", disabled=not user_input.strip()):
+                    with st.spinner("正在处理您的回复..."):
+                        result = continue_conversation(st.session_state.conversation_id, user_input)
+                        if result:
+                            st.session_state.conversation_data = result
+                            st.session_state.user_input = ""
+                            st.rerun()
+            
+            with col2:
+                if requires_confirmation and current_plan:
+                    if st.button("✅ 确认执行", type="secondary"):
+                        try:
+                            response = get_http_session().post(
+                                f"{API_BASE_URL}/api/v2/conversation/{st.session_state.conversation_id}/execute",
+                                timeout=10
+                            )
+                            if response.status_code == 200:
+                                st.success("🎉 计划已开始执行！")
+                                time.sleep(2)
                                 st.rerun()
-                
-                with col2:
-                    if requires_confirmation and current_plan:
-                        if st.button("✅ 确认执行", type="secondary"):
-                            try:
-                                response = requests.post(
-                                    f"{API_BASE_URL}/api/v2/conversation/{st.session_state.conversation_id}/execute",
-                                    timeout=10
-                                )
-                                if response.status_code == 200:
-                                    st.success("🎉 计划已开始执行！")
-                                    time.sleep(2)
-                                    st.rerun()
-                                else:
-                                    st.error("执行失败，请重试")
-                            except Exception as e:
-                                st.error(f"执行失败: {str(e)}")
+                            else:
+                                st.error("执行失败，请重试")
+                        except Exception as e:
+                            st.error(f"执行失败: {str(e)}")
 
 
 if __name__ == "__main__":
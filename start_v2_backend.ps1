@@ -32,5 +32,6 @@ Write-Host "🔄 自动重载: 已启用" -ForegroundColor Cyan
 Write-Host "==========================================" -ForegroundColor Cyan
 Write-Host ""
 
-# 启动服务
+# 启动服务（DEV=1：单进程并启用自动重载）
+$env:DEV = "1"
 python start_backend_v2.py
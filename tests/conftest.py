@@ -0,0 +1,7 @@
+"""Shared pytest configuration"""
+
+import os
+import sys
+
+# 让单元测试可以直接 import backend 下的 app 包
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "backend"))
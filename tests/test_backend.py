@@ -1,7 +1,7 @@
 """Backend API tests"""
 
 import pytest
-import requests
+import httpx
 import time
 from typing import Dict, Any
 
@@ -10,36 +10,42 @@ API_BASE_URL = "http://localhost:8000"
 
 
 @pytest.fixture(scope="module")
-def api_available():
+def client():
+    """Shared HTTP client (keep-alive connection reused across tests)"""
+    with httpx.Client(base_url=API_BASE_URL, timeout=10) as c:
+        yield c
+
+
+@pytest.fixture(scope="module")
+def api_available(client):
     """Check if API is available"""
     try:
-        response = requests.get(f"{API_BASE_URL}/api/health", timeout=2)
+        response = client.get("/api/health", timeout=2)
         return response.status_code == 200
     except:
         return False
 
 
-def test_health_check(api_available):
+def test_health_check(client, api_available):
     """Test health check endpoint"""
     if not api_available:
         pytest.skip("API not available")
     
-    response = requests.get(f"{API_BASE_URL}/api/health", timeout=5)
+    response = client.get("/api/health", timeout=5)
     assert response.status_code == 200
     data = response.json()
     assert data["status"] == "healthy"
     assert "version" in data
 
 
-def test_geocode(api_available):
+def test_geocode(client, api_available):
     """Test geocoding endpoint"""
     if not api_available:
         pytest.skip("API not available")
     
-    response = requests.post(
-        f"{API_BASE_URL}/api/geocode",
-        json={"address": "Jakarta Convention Center, Jakarta, Indonesia"},
-        timeout=10
+    response = client.post(
+        "/api/geocode",
+        json={"address": "Jakarta Convention Center, Jakarta, Indonesia"}
     )
     
     if response.status_code == 200:
@@ -52,19 +58,18 @@ def test_geocode(api_available):
         pytest.skip(f"Geocoding failed: {response.text}")
 
 
-def test_directions(api_available):
+def test_directions(client, api_available):
     """Test directions endpoint"""
     if not api_available:
         pytest.skip("API not available")
     
-    response = requests.post(
-        f"{API_BASE_URL}/api/directions",
+    response = client.post(
+        "/api/directions",
         json={
             "origin": "Hotel Mulia Senayan, Jakarta",
             "destination": "Jakarta Convention Center, Jakarta",
             "mode": "driving"
-        },
-        timeout=10
+        }
     )
     
     if response.status_code == 200:
@@ -75,7 +80,7 @@ def test_directions(api_available):
         pytest.skip(f"Directions failed: {response.text}")
 
 
-def test_simple_plan(api_available):
+def test_simple_plan(client, api_available):
     """Test creating a simple travel plan"""
     if not api_available:
         pytest.skip("API not available")
@@ -102,11 +107,7 @@ def test_simple_plan(api_available):
     }
     
     # Create plan
-    response = requests.post(
-        f"{API_BASE_URL}/api/plan",
-        json=request_data,
-        timeout=10
-    )
+    response = client.post("/api/plan", json=request_data)
     
     assert response.status_code == 200
     data = response.json()
@@ -114,15 +115,13 @@ def test_simple_plan(api_available):
     
     plan_id = data["plan_id"]
     
-    # Poll for status
+    # Poll for status（间隔从 0.25s 起倍增到 2s，完成后尽快发现）
     max_wait = 60  # 1 minute
+    poll_interval = 0.25
     start_time = time.time()
     
     while time.time() - start_time < max_wait:
-        status_response = requests.get(
-            f"{API_BASE_URL}/api/plan/{plan_id}/status",
-            timeout=5
-        )
+        status_response = client.get(f"/api/plan/{plan_id}/status", timeout=5)
         
         if status_response.status_code == 200:
             status_data = status_response.json()
@@ -130,10 +129,7 @@ def test_simple_plan(api_available):
             
             if status == "completed":
                 # Get full result
-                result_response = requests.get(
-                    f"{API_BASE_URL}/api/plan/{plan_id}",
-                    timeout=5
-                )
+                result_response = client.get(f"/api/plan/{plan_id}", timeout=5)
                 assert result_response.status_code == 200
                 result = result_response.json()
                 assert "itinerary_markdown" in result
@@ -141,7 +137,8 @@ def test_simple_plan(api_available):
             elif status == "failed":
                 pytest.fail(f"Plan failed: {status_data.get('error', 'Unknown error')}")
         
-        time.sleep(2)
+        time.sleep(poll_interval)
+        poll_interval = min(poll_interval * 2, 2)
     
     pytest.skip("Plan processing timed out")
 
@@ -0,0 +1,71 @@
+"""Persistent cache unit tests"""
+
+import asyncio
+import sqlite3
+
+from app.services import persistent_cache
+from app.services.persistent_cache import SQLiteCache
+
+
+def _rows_on_disk(path, table: str = "kv") -> int:
+    conn = sqlite3.connect(path)
+    try:
+        return conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+    except sqlite3.OperationalError:
+        return 0
+    finally:
+        conn.close()
+
+
+def test_buffered_write_visible_before_flush(tmp_path):
+    path = str(tmp_path / "cache.db")
+    cache = SQLiteCache(path, flush_every=100)
+    
+    cache[("a", 1)] = {"lat": 1.0}
+    
+    assert cache[("a", 1)] == {"lat": 1.0}
+    assert ("a", 1) in cache
+    assert _rows_on_disk(path) == 0
+    cache.close()
+
+
+def test_flush_threshold_and_reopen(tmp_path):
+    path = str(tmp_path / "cache.db")
+    cache = SQLiteCache(path, flush_every=2)
+    
+    cache["a"] = 1
+    assert _rows_on_disk(path) == 0
+    cache["b"] = 2
+    assert _rows_on_disk(path) == 2
+    cache["c"] = 3
+    cache.close()
+    
+    reopened = SQLiteCache(path)
+    assert [reopened.get(k) for k in "abc"] == [1, 2, 3]
+    reopened.close()
+
+
+def test_ttl_expiry(tmp_path, monkeypatch):
+    cache = SQLiteCache(str(tmp_path / "cache.db"), ttl=60)
+    now = [1_000_000.0]
+    monkeypatch.setattr(persistent_cache.time, "time", lambda: now[0])
+    
+    cache["a"] = "fresh"
+    cache.flush()
+    now[0] += 59
+    assert cache.get("a") == "fresh"
+    now[0] += 2
+    assert cache.get("a", "stale") == "stale"
+    assert "a" not in cache
+    cache.close()
+
+
+def test_async_accessors(tmp_path):
+    cache = SQLiteCache(str(tmp_path / "cache.db"))
+    
+    async def run():
+        await cache.aset("k", [1, 2])
+        return await cache.aget("k"), await cache.aget("missing", "default")
+    
+    assert asyncio.run(run()) == ([1, 2], "default")
+    cache.close()
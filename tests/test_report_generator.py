@@ -0,0 +1,99 @@
+"""Report generator unit tests"""
+
+import re
+
+import numpy as np
+
+from app.services import report_generator
+from app.services.report_generator import ReportGenerator
+
+
+def _plan(first_departure: str = "08:00") -> dict:
+    return {
+        "request": {"city": "雅加达", "total_days": 1, "team_size": 2},
+        "summary": {"total_distance_km": 12.5, "total_duration_hours": 1.5},
+        "days": [
+            {
+                "day": 1,
+                "theme": "客户拜访",
+                "segments": [
+                    {
+                        "from_location": "Hotel",
+                        "to_location": "Client A",
+                        "departure_time": first_departure,
+                        "arrival_time": "12:30",
+                        "distance_meters": np.int64(8000),
+                        "duration_seconds": np.int64(1800),
+                        "is_rush_hour": True,
+                        "activity_description": "拜访客户"
+                    },
+                    {
+                        "from_location": "Client A",
+                        "to_location": "Hotel",
+                        "departure_time": "15:00",
+                        "arrival_time": "15:40",
+                        "distance_meters": 4500,
+                        "duration_seconds": 2400,
+                        "is_rush_hour": False,
+                        "activity_description": "返回酒店"
+                    }
+                ]
+            }
+        ]
+    }
+
+
+def _strip_timestamp(text: str) -> str:
+    return re.sub(r"\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2}", "<now>", text)
+
+
+def test_cache_hit_matches_miss():
+    """A cached report renders the same as a fresh one (numpy values kept intact)"""
+    report_generator._REPORT_CACHE.clear()
+    generator = ReportGenerator()
+    plan = _plan()
+    
+    miss = generator.generate_markdown(plan)
+    assert len(report_generator._REPORT_CACHE) == 1
+    hit = generator.generate_markdown(plan)
+    
+    assert _strip_timestamp(hit) == _strip_timestamp(miss)
+    assert _strip_timestamp(miss) == generator._render_markdown(plan, True, "<now>")
+
+
+def test_cache_keyed_by_include_details():
+    report_generator._REPORT_CACHE.clear()
+    generator = ReportGenerator()
+    plan = _plan()
+    
+    generator.generate_markdown(plan, include_details=True)
+    generator.generate_markdown(plan, include_details=False)
+    
+    assert len(report_generator._REPORT_CACHE) == 2
+
+
+def test_rush_hour_advice_only_for_early_departures():
+    """Noon departures are in the morning bucket but get no rush-hour advice"""
+    generator = ReportGenerator()
+    
+    early = generator._render_markdown(_plan("08:00"), True, "")
+    noon = generator._render_markdown(_plan("12:00"), True, "")
+    
+    assert "**08:00前出发**（关键！避开早高峰）" in early
+    assert "避开早高峰）" not in noon.split("### 出发时间")[1].split("###")[0]
+
+
+def test_sections_join_to_full_report():
+    """Streamed sections (cache miss and hit) concatenate to the full report"""
+    report_generator._REPORT_CACHE.clear()
+    generator = ReportGenerator()
+    plan = _plan()
+    
+    sections = list(generator.generate_markdown_sections(plan))
+    cached_sections = list(generator.generate_markdown_sections(plan))
+    
+    assert len(sections) > 1
+    assert sections[0].startswith("# ") and sections[1].startswith("## ")
+    full = _strip_timestamp(generator.generate_markdown(plan))
+    assert _strip_timestamp("".join(sections)) == full
+    assert _strip_timestamp("".join(cached_sections)) == full
@@ -0,0 +1,89 @@
+"""Route optimizer unit tests"""
+
+import numpy as np
+import pytest
+
+from app.services import route_optimizer
+from app.services.route_optimizer import RouteOptimizer
+from app.services.route_optimizer_numba import _nn_route
+
+
+def _path_length(D: np.ndarray, path) -> float:
+    """Total length of a path (float64 so long paths compare exactly)"""
+    return float(sum(np.float64(D[a, b]) for a, b in zip(path[:-1], path[1:])))
+
+
+def _nn_with_end(D: np.ndarray, start: int, end: int):
+    """Plain nearest neighbor route with a fixed end (reference for 2-opt)"""
+    unvisited = np.ones(D.shape[0], dtype=np.bool_)
+    unvisited[start] = False
+    unvisited[end] = False
+    order = list(_nn_route(D, start, unvisited))
+    return [start, *order, *np.flatnonzero(unvisited), end]
+
+
+def _euclidean(points: np.ndarray) -> np.ndarray:
+    return np.linalg.norm(points[:, None, :] - points[None, :, :], axis=-1).astype(np.float32)
+
+
+@pytest.mark.parametrize("round_trip", [True, False])
+def test_two_opt_never_longer_than_nn_with_fixed_end(round_trip):
+    """2-opt must score the final hop to the end, so it never loses to NN"""
+    optimizer = RouteOptimizer()
+    rng = np.random.default_rng(0)
+    for _ in range(300):
+        n = int(rng.integers(4, 12))
+        D = _euclidean(rng.random((n, 2)) * 10000)
+        end = 0 if round_trip else n - 1
+        
+        path = list(optimizer.optimize_route_order_np(D, 0, end_idx=end))
+        
+        assert path[0] == 0 and path[-1] == end
+        assert sorted(path[1:-1]) == sorted(set(range(n)) - {0, end})
+        assert _path_length(D, path) <= _path_length(D, _nn_with_end(D, 0, end)) + 1e-3
+
+
+def test_two_opt_keeps_final_hop_reachable():
+    """A reversal must not leave an unknown (inf) hop into the end"""
+    # 0 -> 2 -> 1 更短，但只有 2 能到达终点 3
+    D = np.full((4, 4), np.inf, dtype=np.float32)
+    for a, b, meters in [(0, 1, 1), (1, 2, 5), (0, 2, 2), (2, 1, 1), (2, 3, 1)]:
+        D[a, b] = meters
+    
+    path = list(RouteOptimizer().optimize_route_order_np(D, 0, end_idx=3))
+    
+    assert path == [0, 1, 2, 3]
+
+
+def test_optimize_route_order_end_location_last():
+    """String API places the end location last and exactly once"""
+    names = ["hotel", "a", "b", "c"]
+    coords = {"hotel": (0, 0), "a": (1, 0), "b": (1, 1), "c": (0, 1)}
+    distance_matrix = [
+        {
+            "origin": o,
+            "destination": d,
+            "distance_meters": float(np.hypot(*np.subtract(coords[o], coords[d]))) * 1000
+        }
+        for o in names for d in names if o != d
+    ]
+    
+    route = RouteOptimizer().optimize_route_order(["a", "b", "c", "hotel"], "hotel", "hotel", distance_matrix)
+    
+    assert route[0] == "hotel" and route[-1] == "hotel"
+    assert sorted(route[1:-1]) == ["a", "b", "c"]
+
+
+def test_optimize_route_order_cache_shared_across_instances():
+    """The result cache is module-level, keyed only on the route inputs"""
+    distance_matrix = [
+        {"origin": o, "destination": d, "distance_meters": 1000.0 * (i + j + 1)}
+        for i, o in enumerate("sxy") for j, d in enumerate("sxy") if o != d
+    ]
+    route_optimizer._optimize_cached.cache_clear()
+    
+    first = RouteOptimizer().optimize_route_order(["x", "y"], "s", None, distance_matrix)
+    second = RouteOptimizer().optimize_route_order(["x", "y"], "s", None, distance_matrix)
+    
+    assert first == second
+    assert route_optimizer._optimize_cached.cache_info().hits == 1